@@ -198,6 +198,23 @@ class SimpleStorageService:
         except Exception as e:
             raise USvisaException(e, sys) from e
 
+    def write_text(self, content: str, s3_key: str, bucket_name: str) -> None:
+        """
+        Method Name :   write_text
+        Description :   This method writes the content string to the s3_key object of bucket_name bucket
+
+        Output      :   Object is created or replaced in s3 bucket
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        logging.info("Entered the write_text method of S3Operations class")
+
+        try:
+            self.s3_client.put_object(Bucket=bucket_name, Key=s3_key, Body=content.encode())
+            logging.info(f"Wrote {s3_key} object in {bucket_name} bucket")
+
+        except Exception as e:
+            raise USvisaException(e, sys) from e
+
     def upload_df_as_csv(self,data_frame: DataFrame,local_filename: str, bucket_filename: str,bucket_name: str,) -> None:
         """
         Method Name :   upload_df_as_csv
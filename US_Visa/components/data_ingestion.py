@@ -1,6 +1,9 @@
+import hashlib
 import os
 import sys
+from typing import Optional
 
+from bson import json_util
 from pandas import DataFrame
 from sklearn.model_selection import train_test_split
 
@@ -9,6 +12,9 @@ from US_Visa.entity.artifact_entity import DataIngestionArtifact
 from US_Visa.exception import USvisaException
 from US_Visa.logger import logging
 from US_Visa.data_access.usvisa_data import USvisaData
+from US_Visa.constant import SCHEMA_FILE_PATH, TARGET_COLUMN
+from US_Visa.utils.main_utils import read_yaml_file, compact_dataframe, save_parquet_data, load_parquet_data, \
+    get_hash_split_mask, concat_compacted_dataframes
 
 class DataIngestion:
     def __init__(self, data_ingestion_config: DataIngestionConfig = DataIngestionConfig()):
@@ -19,39 +25,163 @@ class DataIngestion:
         try:
             # Save the provided data ingestion configuration for later use
             self.data_ingestion_config = data_ingestion_config
+            # Schema the feature store dtypes are taken from
+            self._schema_config = read_yaml_file(file_path=SCHEMA_FILE_PATH)
         except Exception as e:
             # Wrap any exception in a custom USvisaException for consistency across the project
             logging.error(f"Error occurred while initializing DataIngestion: {e}")
             raise USvisaException(e, sys)
 
+    def read_watermark(self):
+        """
+        Return the watermark persisted by the last ingestion on the configured watermark field,
+        None when there is none or it was kept on another field (a full export is needed then).
+        """
+        watermark_file_path = self.data_ingestion_config.watermark_file_path
+        if not os.path.exists(watermark_file_path):
+            return None
+        with open(watermark_file_path, "r") as watermark_file:
+            # json_util keeps ObjectId and datetime watermarks typed across runs
+            watermark = json_util.loads(watermark_file.read())
+        if watermark.get("field") != self.data_ingestion_config.watermark_field:
+            return None
+        return watermark.get("value")
+
+    @staticmethod
+    def write_state_file(file_path: str, content: dict) -> None:
+        """
+        Persist ingestion state kept across runs, atomically; json_util keeps ObjectId and datetime values typed.
+        """
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        staging_file_path = file_path + ".tmp"
+        with open(staging_file_path, "w") as state_file:
+            state_file.write(json_util.dumps(content))
+        os.replace(staging_file_path, file_path)
+
+    def write_watermark(self, value) -> None:
+        """
+        Persist the watermark of the documents merged into the feature store, atomically.
+        """
+        self.write_state_file(self.data_ingestion_config.watermark_file_path,
+                              {"field": self.data_ingestion_config.watermark_field, "value": value})
+
+    def get_fingerprint(self, usvisa_data: USvisaData) -> dict:
+        """
+        Fingerprint what the ingestion artifacts are derived from: the source collection (count, max _id and,
+        when configured, its server-side hash) and the settings shaping the artifacts (schema and split).
+        """
+        config = self.data_ingestion_config
+        with open(SCHEMA_FILE_PATH, "rb") as schema_file:
+            schema_digest = hashlib.md5(schema_file.read()).hexdigest()
+        return {
+            "source": usvisa_data.get_collection_fingerprint(collection_name=config.collection_name,
+                                                             watermark_field=config.watermark_field,
+                                                             use_db_hash=config.fingerprint_db_hash),
+            "schema": schema_digest,
+            "split": {"mode": config.split_mode, "ratio": config.train_test_split_ratio,
+                      "exact_stratify": config.split_exact_stratify, "hash_key": config.split_hash_key},
+        }
+
+    def get_cached_artifact(self, fingerprint: dict) -> Optional[DataIngestionArtifact]:
+        """
+        Return the artifact of the last ingestion when it was made from the same fingerprint and its
+        files are still there, None otherwise.
+        """
+        fingerprint_file_path = self.data_ingestion_config.fingerprint_file_path
+        if not os.path.exists(fingerprint_file_path):
+            return None
+        with open(fingerprint_file_path, "r") as fingerprint_file:
+            cached = json_util.loads(fingerprint_file.read())
+        if cached.get("fingerprint") != fingerprint:
+            return None
+        artifact = DataIngestionArtifact(trained_file_path=cached["trained_file_path"],
+                                         test_file_path=cached["test_file_path"])
+        if not (os.path.exists(artifact.trained_file_path) and os.path.exists(artifact.test_file_path)):
+            return None
+        return artifact
+
     def export_data_into_feature_store(self) -> DataFrame:
         """
         Method Name : export_data_into_feature_store
-        Description : Exports data from MongoDB by reading the specified collection and then converts it into a CSV file.
-        Output      : Returns the data as a pandas DataFrame and stores the CSV in the configured feature store path.
+        Description : Exports data from MongoDB by reading the specified collection and then saves it as a Parquet file
+                      compacted from the schema: categoricals for category columns, narrowest widths for numeric ones.
+                      With incremental ingestion only the documents past the persisted watermark are fetched and
+                      merged by case_id into the feature store kept across runs, so changed cases replace their
+                      previous version. The first run, or a run without a usable watermark, exports everything.
+        Output      : Returns the compacted DataFrame and stores it in the configured feature store path.
         On Failure  : Logs the exception and raises a USvisaException.
         """
         try:
+            config = self.data_ingestion_config
             # Log the start of the data export process from MongoDB
             logging.info("Exporting data from mongodb")
             # Create an instance of USvisaData to handle MongoDB connection and data retrieval
             usvisa_data = USvisaData()
-            # Export the entire collection as a DataFrame using the collection name from the configuration
-            dataframe = usvisa_data.export_collection_as_dataframe(
-                collection_name=self.data_ingestion_config.collection_name
-            )
+
+            # Fix the upper bound before reading, so documents inserted during the export are left
+            # for the next run instead of being skipped by a watermark taken afterwards.
+            high_watermark = usvisa_data.get_max_field_value(collection_name=config.collection_name,
+                                                             field_name=config.watermark_field)
+            low_watermark = None
+            if config.incremental and os.path.exists(config.persistent_feature_store_file_path):
+                low_watermark = self.read_watermark()
+
+            if high_watermark is None:
+                query = None
+            elif low_watermark is None:
+                query = {config.watermark_field: {"$lte": high_watermark}}
+            else:
+                query = {config.watermark_field: {"$gt": low_watermark, "$lte": high_watermark}}
+
+            # Export the documents selected by the watermarks using the collection name from the configuration
+            if config.export_partitions > 1:
+                # Large collections: _id ranges read concurrently into part files, then stitched in _id order
+                part_file_paths = usvisa_data.export_collection_partitioned(
+                    collection_name=config.collection_name,
+                    output_dir=config.feature_store_parts_dir,
+                    n_partitions=config.export_partitions,
+                    max_workers=config.export_max_workers,
+                    query=query,
+                    batch_size=config.export_batch_size,
+                    executor=config.export_executor
+                )
+                # Parts are compacted on the fixed schema categories, so only case_id needs its categories unified
+                dataframe = concat_compacted_dataframes([
+                    compact_dataframe(load_parquet_data(part_file_path), self._schema_config)
+                    for part_file_path in part_file_paths])
+            else:
+                dataframe = usvisa_data.export_collection_as_dataframe(
+                    collection_name=config.collection_name,
+                    batch_size=config.export_batch_size,
+                    query=query
+                )
+
+            if low_watermark is not None:
+                logging.info(f"Fetched {len(dataframe)} new or changed documents past watermark [{low_watermark}]")
+                existing_dataframe = load_parquet_data(config.persistent_feature_store_file_path)
+                if len(dataframe) > 0:
+                    # Later versions of a case replace the stored one
+                    dataframe = concat_compacted_dataframes([
+                        existing_dataframe, compact_dataframe(dataframe, self._schema_config)])
+                    dataframe = dataframe.drop_duplicates(subset=["case_id"], keep="last", ignore_index=True)
+                else:
+                    dataframe = existing_dataframe
+            dataframe = compact_dataframe(dataframe, self._schema_config)
             # Log the shape of the retrieved DataFrame for verification purposes
             logging.info(f"Shape of dataframe: {dataframe.shape}")
-            # Retrieve the file path where the feature store CSV should be saved from the configuration
-            feature_store_file_path = self.data_ingestion_config.feature_store_file_path
-            # Extract the directory path from the file path
-            dir_path = os.path.dirname(feature_store_file_path)
-            # Create the directory if it does not already exist (ensuring compatibility across platforms)
-            os.makedirs(dir_path, exist_ok=True)
+
+            if config.incremental:
+                save_parquet_data(config.persistent_feature_store_file_path, dataframe)
+                # The watermark only moves once the merged store is in place: a failed run fetches the delta again
+                if high_watermark is not None:
+                    self.write_watermark(high_watermark)
+
+            # Retrieve the file path where the feature store should be saved from the configuration
+            feature_store_file_path = config.feature_store_file_path
             # Log the file path where data will be saved
             logging.info(f"Saving exported data into feature store file path: {feature_store_file_path}")
-            # Save the DataFrame to a CSV file without the index and with headers
-            dataframe.to_csv(feature_store_file_path, index=False, header=True)
+            # Save the DataFrame as Parquet, keeping the schema dtypes for the downstream stages
+            save_parquet_data(feature_store_file_path, dataframe)
             # Return the DataFrame for downstream processing
             return dataframe
         except Exception as e:
@@ -63,25 +193,35 @@ class DataIngestion:
         """
         Method Name : split_data_as_train_test
         Description : Splits the given DataFrame into training and testing sets based on the configured split ratio.
-        Output      : Saves the train and test sets as CSV files in the specified paths.
+                      In "hash" mode every row is assigned by hashing its case_id, so a case stays on the same
+                      side across runs and appended cases do not reshuffle the existing ones; the split is
+                      stratified on the target in expectation. split_exact_stratify holds the ratio exactly per
+                      class instead, giving up that stability. In "random" mode the rows are reshuffled on every run.
+        Output      : Saves the train and test sets as Parquet files in the specified paths.
         On Failure  : Logs the error and raises a USvisaException.
         """
         logging.info("Entered split_data_as_train_test method of Data_Ingestion class")
         try:
-            # Use train_test_split (typically from sklearn.model_selection) to split the data
-            train_set, test_set = train_test_split(
-                dataframe, test_size=self.data_ingestion_config.train_test_split_ratio
-            )
-            logging.info("Performed train test split on the dataframe")
+            config = self.data_ingestion_config
+            if config.split_mode == "hash":
+                test_mask = get_hash_split_mask(
+                    dataframe["case_id"], test_ratio=config.train_test_split_ratio,
+                    labels=dataframe[TARGET_COLUMN], hash_key=config.split_hash_key,
+                    exact_stratify=config.split_exact_stratify
+                )
+                train_set, test_set = dataframe[~test_mask], dataframe[test_mask]
+            else:
+                # Use train_test_split (typically from sklearn.model_selection) to split the data
+                train_set, test_set = train_test_split(
+                    dataframe, test_size=config.train_test_split_ratio
+                )
+            logging.info(f"Performed {config.split_mode} train test split on the dataframe: "
+                         f"{len(train_set)} train rows, {len(test_set)} test rows")
             logging.info("Exited split_data_as_train_test method of Data_Ingestion class")
-            # Obtain the directory path for the training file from the configuration
-            dir_path = os.path.dirname(self.data_ingestion_config.training_file_path)
-            # Create the directory if it doesn't exist, ensuring that file save operation will succeed
-            os.makedirs(dir_path, exist_ok=True)
             logging.info("Exporting train and test file path.")
-            # Save the train and test datasets to CSV files with headers and without an index column
-            train_set.to_csv(self.data_ingestion_config.training_file_path, index=False, header=True)
-            test_set.to_csv(self.data_ingestion_config.testing_file_path, index=False, header=True)
+            # Save the train and test datasets as Parquet files, keeping the schema dtypes
+            save_parquet_data(self.data_ingestion_config.training_file_path, train_set)
+            save_parquet_data(self.data_ingestion_config.testing_file_path, test_set)
             logging.info("Exported train and test file path.")
         except Exception as e:
             # Use exception chaining to provide complete traceback information with custom exception
@@ -92,15 +232,27 @@ class DataIngestion:
         Method Name : initiate_data_ingestion
         Description : Orchestrates the data ingestion process. It exports data from MongoDB,
                       splits it into training and testing sets, and returns these paths as an artifact.
-        Output      : Returns a DataIngestionArtifact containing paths to the training and test CSV files.
+                      When the collection fingerprint and the settings match the last ingestion, the artifact
+                      of that ingestion is returned instead, without reading the collection.
+        Output      : Returns a DataIngestionArtifact containing paths to the training and test Parquet files.
         On Failure  : Logs any error encountered and raises a USvisaException.
         """
         logging.info("Entered initiate_data_ingestion method of Data_Ingestion class")
         try:
+            fingerprint = None
+            if self.data_ingestion_config.reuse_unchanged:
+                # Scheduled retrains mostly run on unchanged data: skip the export and split when the
+                # collection and the settings are the same as for the last ingestion
+                fingerprint = self.get_fingerprint(USvisaData())
+                cached_artifact = self.get_cached_artifact(fingerprint)
+                if cached_artifact is not None:
+                    logging.info(f"Collection unchanged since the last ingestion, reusing: {cached_artifact}")
+                    return cached_artifact
+
             # First, export the data from MongoDB into the feature store and obtain it as a DataFrame
             dataframe = self.export_data_into_feature_store()
             logging.info("Got the data from mongodb")
-            # Next, split the DataFrame into training and testing sets and save them to CSV files
+            # Next, split the DataFrame into training and testing sets and save them as Parquet files
             self.split_data_as_train_test(dataframe)
             logging.info("Performed train test split on the dataset")
             logging.info("Exited initiate_data_ingestion method of Data_Ingestion class")
@@ -111,6 +263,11 @@ class DataIngestion:
             )
             # Log the details of the artifact for tracking purposes
             logging.info(f"Data ingestion artifact: {data_ingestion_artifact}")
+            if fingerprint is not None:
+                self.write_state_file(self.data_ingestion_config.fingerprint_file_path,
+                                      {"fingerprint": fingerprint,
+                                       "trained_file_path": data_ingestion_artifact.trained_file_path,
+                                       "test_file_path": data_ingestion_artifact.test_file_path})
             # Return the artifact so that downstream components can make use of this data
             return data_ingestion_artifact
         except Exception as e:
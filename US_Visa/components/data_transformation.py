@@ -12,8 +12,10 @@ from US_Visa.entity.config_entity import DataTransformationConfig
 from US_Visa.entity.artifact_entity import DataTransformationArtifact, DataIngestionArtifact, DataValidationArtifact
 from US_Visa.exception import USvisaException
 from US_Visa.logger import logging
-from US_Visa.utils.main_utils import save_object, save_numpy_array_data, read_yaml_file, drop_columns
+from US_Visa.utils.main_utils import save_object, save_numpy_array_data, read_yaml_file, drop_columns, \
+    load_parquet_data, get_model_input_columns
 from US_Visa.entity.estimator import TargetValueMapping
+from US_Visa.entity.compiled_preprocessor import CompiledPreprocessor
 
 
 
@@ -34,9 +36,9 @@ class DataTransformation:
             raise USvisaException(e, sys)
 
     @staticmethod
-    def read_data(file_path) -> pd.DataFrame:
+    def read_data(file_path, columns: list = None) -> pd.DataFrame:
         try:
-            return pd.read_csv(file_path)
+            return load_parquet_data(file_path, columns=columns)
         except Exception as e:
             raise USvisaException(e, sys)
 
@@ -91,6 +93,31 @@ class DataTransformation:
         except Exception as e:
             raise USvisaException(e, sys) from e
 
+    def export_compiled_preprocessor(self, preprocessor: ColumnTransformer, input_feature_df: pd.DataFrame):
+        """
+        Method Name :   export_compiled_preprocessor
+        Description :   This method compiles the fitted preprocessor into flat NumPy lookup structures,
+                        checks it against sklearn's output on input_feature_df and saves it
+
+        Output      :   Returns the saved file path, None if the preprocessor cannot be compiled
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            try:
+                compiled_preprocessor = CompiledPreprocessor.from_column_transformer(preprocessor)
+            except NotImplementedError as e:
+                logging.warning(f"Preprocessor can not be compiled, serving will use sklearn: {e}")
+                return None
+
+            compiled_preprocessor.verify(preprocessor, input_feature_df)
+            save_object(self.data_transformation_config.compiled_object_file_path, compiled_preprocessor)
+
+            logging.info("Saved the compiled preprocessor object")
+            return self.data_transformation_config.compiled_object_file_path
+
+        except Exception as e:
+            raise USvisaException(e, sys) from e
+
     def initiate_data_transformation(self, ) -> DataTransformationArtifact:
         """
         Method Name :   initiate_data_transformation
@@ -105,8 +132,12 @@ class DataTransformation:
                 preprocessor = self.get_data_transformer_object()
                 logging.info("Got the preprocessor object")
 
-                train_df = DataTransformation.read_data(file_path=self.data_ingestion_artifact.trained_file_path)
-                test_df = DataTransformation.read_data(file_path=self.data_ingestion_artifact.test_file_path)
+                # Only the columns the preprocessor and the target need are read from the feature store
+                input_columns = get_model_input_columns(self._schema_config)
+                train_df = DataTransformation.read_data(file_path=self.data_ingestion_artifact.trained_file_path,
+                                                        columns=input_columns)
+                test_df = DataTransformation.read_data(file_path=self.data_ingestion_artifact.test_file_path,
+                                                       columns=input_columns)
 
                 input_feature_train_df = train_df.drop(columns=[TARGET_COLUMN], axis=1)
                 target_feature_train_df = train_df[TARGET_COLUMN]
@@ -117,13 +148,14 @@ class DataTransformation:
 
                 logging.info("Added company_age column to the Training dataset")
 
-                drop_cols = self._schema_config['drop_columns']
+                # Columns not read from the feature store have nothing to drop
+                drop_cols = [col for col in self._schema_config['drop_columns'] if col in train_df.columns]
 
                 logging.info("drop the columns in drop_cols of Training dataset")
 
                 input_feature_train_df = drop_columns(df=input_feature_train_df, cols = drop_cols)
                 
-                target_feature_train_df = target_feature_train_df.replace(
+                target_feature_train_df = target_feature_train_df.astype(object).replace(
                     TargetValueMapping()._asdict()
                 )
 
@@ -141,7 +173,7 @@ class DataTransformation:
 
                 logging.info("drop the columns in drop_cols of Test dataset")
 
-                target_feature_test_df = target_feature_test_df.replace(
+                target_feature_test_df = target_feature_test_df.astype(object).replace(
                 TargetValueMapping()._asdict()
                 )
 
@@ -161,6 +193,8 @@ class DataTransformation:
 
                 logging.info("Used the preprocessor object to transform the test features")
 
+                compiled_object_file_path = self.export_compiled_preprocessor(preprocessor, input_feature_test_df)
+
                 logging.info("Applying SMOTEENN on Training dataset")
 
                 smt = SMOTEENN(sampling_strategy="minority")
@@ -202,7 +236,8 @@ class DataTransformation:
                 data_transformation_artifact = DataTransformationArtifact(
                     transformed_object_file_path=self.data_transformation_config.transformed_object_file_path,
                     transformed_train_file_path=self.data_transformation_config.transformed_train_file_path,
-                    transformed_test_file_path=self.data_transformation_config.transformed_test_file_path
+                    transformed_test_file_path=self.data_transformation_config.transformed_test_file_path,
+                    compiled_object_file_path=compiled_object_file_path
                 )
                 return data_transformation_artifact
             else:
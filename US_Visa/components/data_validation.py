@@ -9,7 +9,7 @@ from pandas import DataFrame
 
 from US_Visa.exception import USvisaException
 from US_Visa.logger import logging
-from US_Visa.utils.main_utils import read_yaml_file, write_yaml_file
+from US_Visa.utils.main_utils import read_yaml_file, write_yaml_file, load_parquet_data
 from US_Visa.entity.artifact_entity import DataIngestionArtifact, DataValidationArtifact
 from US_Visa.entity.config_entity import DataValidationConfig
 from US_Visa.constant import SCHEMA_FILE_PATH
@@ -75,9 +75,9 @@ class DataValidation:
             raise USvisaException(e, sys) from e
 
     @staticmethod
-    def read_data(file_path) -> DataFrame:
+    def read_data(file_path, columns: list = None) -> DataFrame:
         try:
-            return pd.read_csv(file_path)
+            return load_parquet_data(file_path, columns=columns)
         except Exception as e:
             raise USvisaException(e, sys)
 
@@ -2,7 +2,7 @@ from US_Visa.entity.config_entity import ModelEvaluationConfig
 from US_Visa.entity.artifact_entity import ModelTrainerArtifact, DataIngestionArtifact, ModelEvaluationArtifact
 from sklearn.metrics import f1_score
 from US_Visa.exception import USvisaException
-from US_Visa.constant import TARGET_COLUMN, CURRENT_YEAR
+from US_Visa.constant import TARGET_COLUMN, CURRENT_YEAR, SCHEMA_FILE_PATH
 from US_Visa.logger import logging
 import sys
 import pandas as pd
@@ -11,6 +11,7 @@ from US_Visa.entity.s3_estimator import USvisaEstimator
 from dataclasses import dataclass
 from US_Visa.entity.estimator import USvisaModel
 from US_Visa.entity.estimator import TargetValueMapping
+from US_Visa.utils.main_utils import read_yaml_file, load_parquet_data, get_model_input_columns
 
 @dataclass
 class EvaluateModelResponse:
@@ -61,11 +62,13 @@ class ModelEvaluation:
         On Failure  :   Write an exception log and then raise an exception
         """
         try:
-            test_df = pd.read_csv(self.data_ingestion_artifact.test_file_path)
+            schema_config = read_yaml_file(file_path=SCHEMA_FILE_PATH)
+            test_df = load_parquet_data(self.data_ingestion_artifact.test_file_path,
+                                        columns=get_model_input_columns(schema_config))
             test_df['company_age'] = CURRENT_YEAR-test_df['yr_of_estab']
 
             x, y = test_df.drop(TARGET_COLUMN, axis=1), test_df[TARGET_COLUMN]
-            y = y.replace(
+            y = y.astype(object).replace(
                 TargetValueMapping()._asdict()
             )
 
@@ -6,6 +6,7 @@ from US_Visa.logger import logging
 from US_Visa.entity.artifact_entity import ModelPusherArtifact, ModelEvaluationArtifact
 from US_Visa.entity.config_entity import ModelPusherConfig
 from US_Visa.entity.s3_estimator import USvisaEstimator
+from US_Visa.entity.s3_model_registry import USvisaS3ModelRegistry
 
 
 class ModelPusher:
@@ -20,6 +21,8 @@ class ModelPusher:
         self.model_pusher_config = model_pusher_config
         self.usvisa_estimator = USvisaEstimator(bucket_name=model_pusher_config.bucket_name,
                                 model_path=model_pusher_config.s3_model_key_path)
+        self.model_registry = USvisaS3ModelRegistry(bucket_name=model_pusher_config.bucket_name,
+                                                    registry_key_prefix=model_pusher_config.registry_key_prefix)
 
     def initiate_model_pusher(self) -> ModelPusherArtifact:
         """
@@ -34,11 +37,17 @@ class ModelPusher:
         try:
             logging.info("Uploading artifacts folder to s3 bucket")
 
+            model_version = self.model_pusher_config.model_version
+            s3_model_path = self.model_registry.publish_model(from_file=self.model_evaluation_artifact.trained_model_path,
+                                                              version=model_version)
+
+            # model.pkl stays the production model ModelEvaluation compares against.
             self.usvisa_estimator.save_model(from_file=self.model_evaluation_artifact.trained_model_path)
 
 
             model_pusher_artifact = ModelPusherArtifact(bucket_name=self.model_pusher_config.bucket_name,
-                                                        s3_model_path=self.model_pusher_config.s3_model_key_path)
+                                                        s3_model_path=s3_model_path,
+                                                        model_version=model_version)
 
             logging.info("Uploaded artifacts folder to s3 bucket")
             logging.info(f"Model pusher artifact: [{model_pusher_artifact}]")
@@ -14,6 +14,7 @@ from US_Visa.utils.main_utils import load_numpy_array_data, read_yaml_file, load
 from US_Visa.entity.config_entity import ModelTrainerConfig
 from US_Visa.entity.artifact_entity import DataTransformationArtifact, ModelTrainerArtifact, ClassificationMetricArtifact
 from US_Visa.entity.estimator import USvisaModel
+from US_Visa.entity.numpy_model import save_numpy_model
 
 class ModelTrainer:
     def __init__(self, data_transformation_artifact: DataTransformationArtifact,
@@ -58,6 +59,23 @@ class ModelTrainer:
             raise USvisaException(e, sys) from e
         
 
+    def export_numpy_model(self, usvisa_model: USvisaModel, x_test: np.array):
+        """
+        Method Name :   export_numpy_model
+        Description :   This function writes the .npy export of the model next to the pickle,
+                        checked to predict exactly like the trained model on the test features
+
+        Output      :   Returns the versioned export directory, None if the model has no NumPy format
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            return save_numpy_model(usvisa_model, directory=self.model_trainer_config.numpy_model_dir,
+                                    verification_array=x_test)
+        except (NotImplementedError, ValueError) as e:
+            logging.warning(f"Model can not be exported in the NumPy format, only the pickle is saved: {e}")
+            return None
+
+
     def initiate_model_trainer(self, ) -> ModelTrainerArtifact:
         logging.info("Entered initiate_model_trainer method of ModelTrainer class")
         """
@@ -75,20 +93,29 @@ class ModelTrainer:
             
             preprocessing_obj = load_object(file_path=self.data_transformation_artifact.transformed_object_file_path)
 
+            compiled_preprocessing_obj = None
+            if self.data_transformation_artifact.compiled_object_file_path is not None:
+                compiled_preprocessing_obj = load_object(file_path=self.data_transformation_artifact.compiled_object_file_path)
+
 
             if best_model_detail.best_score < self.model_trainer_config.expected_accuracy:
                 logging.info("No best model found with score more than base score")
                 raise Exception("No best model found with score more than base score")
 
             usvisa_model = USvisaModel(preprocessing_object=preprocessing_obj,
-                                       trained_model_object=best_model_detail.best_model)
+                                       trained_model_object=best_model_detail.best_model,
+                                       compiled_preprocessing_object=compiled_preprocessing_obj,
+                                       decision_threshold=self.model_trainer_config.decision_threshold)
             logging.info("Created usvisa model object with preprocessor and model")
             logging.info("Created best model file path.")
             save_object(self.model_trainer_config.trained_model_file_path, usvisa_model)
 
+            numpy_model_dir = self.export_numpy_model(usvisa_model, x_test=test_arr[:, :-1])
+
             model_trainer_artifact = ModelTrainerArtifact(
                 trained_model_file_path=self.model_trainer_config.trained_model_file_path,
                 metric_artifact=metric_artifact,
+                numpy_model_dir=numpy_model_dir,
             )
             logging.info(f"Model trainer artifact: {model_trainer_artifact}")
             return model_trainer_artifact
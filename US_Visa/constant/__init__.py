@@ -18,15 +18,16 @@ PIPELINE_NAME: str = "usvisa"        # Name of the ML pipeline. Useful in loggin
 ARTIFACT_DIR: str = "artifact"       # Base directory to store artifacts generated during pipeline runs (e.g., logs, models, data splits).
 
 # File Names for Data and Model Artifacts
-TRAIN_FILE_NAME: str = "train.csv"   # File name for the training dataset generated during data ingestion.
-TEST_FILE_NAME: str = "test.csv"     # File name for the testing dataset generated during data ingestion.
-FILE_NAME: str = "usvisa.csv"        # Raw data file name that may be ingested from MongoDB before processing.
+TRAIN_FILE_NAME: str = "train.parquet"   # File name for the training dataset generated during data ingestion, typed from the schema.
+TEST_FILE_NAME: str = "test.parquet"     # File name for the testing dataset generated during data ingestion, typed from the schema.
+FILE_NAME: str = "usvisa.parquet"        # Feature store file the data ingested from MongoDB is saved to before splitting.
 MODEL_FILE_NAME = "model.pkl"        # File name for the serialized model artifact post training.
 
 
 TARGET_COLUMN = "case_status"
 CURRENT_YEAR = date.today().year
 PREPROCSSING_OBJECT_FILE_NAME = "preprocessing.pkl"
+COMPILED_PREPROCESSING_OBJECT_FILE_NAME = "compiled_preprocessing.pkl"
 SCHEMA_FILE_PATH = os.path.join("config", "schema.yaml")
 
 AWS_ACCESS_KEY_ID_ENV_KEY = os.getenv("AWS_ACCESS_KEY_ID")
@@ -43,6 +44,30 @@ DATA_INGESTION_DIR_NAME: str = "data_ingestion"      # Base folder for all data
 DATA_INGESTION_FEATURE_STORE_DIR: str = "feature_store"  # Subdirectory to store processed feature data for downstream tasks.
 DATA_INGESTION_INGESTED_DIR: str = "ingested"        # Subdirectory to store the final output of the ingested data (e.g., after train/test split).
 DATA_INGESTION_TRAIN_TEST_SPLIT_RATIO: float = 0.2   # Ratio defining the fraction of data reserved for testing; facilitates consistent train/test splits.
+DATA_INGESTION_SPLIT_MODE: str = os.getenv("DATA_INGESTION_SPLIT_MODE", "hash")               # "hash" assigns every case_id to a fixed side of the split, "random" reshuffles every run.
+DATA_INGESTION_SPLIT_EXACT_STRATIFY: bool = os.getenv("DATA_INGESTION_SPLIT_EXACT_STRATIFY", "0") == "1"  # Hash split holding the test ratio exactly per case_status class; NOT stable, appends move existing rows.
+DATA_INGESTION_SPLIT_HASH_KEY: str = "usvisa_split_v01"                                      # 16 character key of the case_id hash, changing it redraws the hash split.
+DATA_INGESTION_INCREMENTAL: bool = os.getenv("DATA_INGESTION_INCREMENTAL", "1") == "1"   # Fetch only documents past the persisted watermark and merge them into the persistent feature store.
+DATA_INGESTION_WATERMARK_FIELD: str = os.getenv("DATA_INGESTION_WATERMARK_FIELD", "_id")   # Monotonic field the watermark is kept on, e.g. an updated_at timestamp to also pick up changed documents.
+DATA_INGESTION_STATE_DIR: str = os.path.join(ARTIFACT_DIR, "feature_store")               # Feature store and watermark kept across pipeline runs, outside the timestamped artifact dirs.
+DATA_INGESTION_WATERMARK_FILE_NAME: str = "watermark.json"                                # Watermark of the last merged document, next to the persistent feature store.
+DATA_INGESTION_REUSE_UNCHANGED: bool = os.getenv("DATA_INGESTION_REUSE_UNCHANGED", "1") == "1"         # Reuse the last feature store and split when the collection fingerprint did not change.
+DATA_INGESTION_FINGERPRINT_DB_HASH: bool = os.getenv("DATA_INGESTION_FINGERPRINT_DB_HASH", "0") == "1"  # Add the server-side dbHash of the collection to the fingerprint, catching in-place updates.
+DATA_INGESTION_FINGERPRINT_FILE_NAME: str = "fingerprint.json"                                          # Fingerprint and artifact paths of the last ingestion, next to the persistent feature store.
+DATA_INGESTION_EXPORT_PARTITIONS: int = int(os.getenv("DATA_INGESTION_EXPORT_PARTITIONS", 1))       # _id range partitions exported concurrently into part files, 1 keeps the single cursor export.
+DATA_INGESTION_EXPORT_MAX_WORKERS: int = int(os.getenv("DATA_INGESTION_EXPORT_MAX_WORKERS", os.cpu_count() or 1))  # Pool size reading the partitions.
+DATA_INGESTION_EXPORT_EXECUTOR: str = os.getenv("DATA_INGESTION_EXPORT_EXECUTOR", "process")        # "process" decodes BSON on every core, "thread" shares one interpreter (and works with an in-memory client).
+DATA_INGESTION_PARTITION_SAMPLE_FACTOR: int = 64                                                    # _id values sampled per partition to place the partition bounds.
+DATA_INGESTION_FEATURE_STORE_PARTS_DIR: str = "parts"                                               # Part files of the partitioned export, under the feature store dir of the run.
+DATA_INGESTION_EXPORT_BATCH_SIZE: int = int(os.getenv("DATA_INGESTION_EXPORT_BATCH_SIZE", 5000))  # Documents per cursor round trip, and per write into the typed column buffers, of the streaming export.
+
+
+"""
+Batch prediction related constants
+Used by the offline batch scoring entry point batch_prediction.py.
+"""
+BATCH_PREDICTION_COLLECTION_NAME: str = "visa_predictions"  # Collection the predictions are upserted into, keyed by case_id.
+BATCH_PREDICTION_BATCH_SIZE: int = 10000                    # Documents read per cursor batch and scored per worker task.
 
 
 """
@@ -69,6 +94,14 @@ MODEL_TRAINER_TRAINED_MODEL_DIR: str = "trained_model"
 MODEL_TRAINER_TRAINED_MODEL_NAME: str = "model.pkl"
 MODEL_TRAINER_EXPECTED_SCORE: float = 0.6
 MODEL_TRAINER_MODEL_CONFIG_FILE_PATH: str = os.path.join("config", "model.yaml")
+MODEL_TRAINER_DECISION_THRESHOLD = os.getenv("MODEL_TRAINER_DECISION_THRESHOLD")  # Score of class 1 stored with the model, predicting 1 at or above it; unset keeps predict.
+MODEL_TRAINER_NUMPY_MODEL_DIR: str = "numpy_model"      # Directory of the .npy export of the trained model, next to trained_model.
+NUMPY_MODEL_FORMAT_VERSION: int = 2                     # Version of the .npy model layout, also the name of its subdirectory (v2).
+NUMPY_MODEL_MANIFEST_FILE_NAME: str = "manifest.json"   # Lists every array file of a NumPy model with its dtype and shape.
+KNN_INDEX_LEAVES_PER_ROUND: int = 8                     # Leaves every active query scans per round of the batched kd-tree KNN search.
+KNN_INDEX_SEED_LEVELS: int = 2                          # Levels above the leaves of the node whose rows seed the k-th distance of each KNN query.
+KNN_INDEX_LEVELS_PER_STEP: int = 3                      # Tree levels the batched KNN descent expands at once; more levels, fewer passes but coarser pruning.
+KNN_INDEX_MIN_LEAVES_PER_ROUND: int = 64                # Leaves a round scans across the whole batch at least, so small batches need few rounds.
 
 
 """
@@ -77,7 +110,58 @@ MODEL EVALUATION related constant
 MODEL_EVALUATION_CHANGED_THRESHOLD_SCORE: float = 0.02
 MODEL_BUCKET_NAME = "usvisa-model2025-stavan"
 MODEL_PUSHER_S3_KEY = "model-registry"
+MODEL_REGISTRY_LATEST_POINTER: str = "LATEST"        # Object under MODEL_PUSHER_S3_KEY holding the version serving replicas should use.
+MODEL_REGISTRY_LEGACY_VERSION: str = "legacy"        # Version name of the unversioned model.pkl, used while the registry has no LATEST pointer.
+MODEL_REGISTRY_MAX_RESIDENT_MODELS: int = int(os.getenv("MODEL_REGISTRY_MAX_RESIDENT_MODELS", 3))  # Model versions kept loaded per serving process, least recently used evicted.
 
 
 APP_HOST = "0.0.0.0"
-APP_PORT = 8080
\ No newline at end of file
+APP_PORT = 8080
+APP_IMPORT_TIME_BUDGET_SECONDS: float = float(os.getenv("APP_IMPORT_TIME_BUDGET_SECONDS", 5))  # Import time of app.py above which a warning is logged.
+# Packages only the training worker may import, their presence in the serving process is a regression.
+APP_TRAINING_ONLY_MODULES: tuple = ("evidently", "imblearn", "neuro_mf", "US_Visa.components",
+                                    "US_Visa.pipeline.training_pipeline")
+
+
+"""
+Prediction serving related constants
+Batch size and wait window of the request coalescer can be overridden through the environment.
+"""
+PREDICTION_BATCH_MAX_SIZE: int = int(os.getenv("PREDICTION_BATCH_MAX_SIZE", 64))          # Flush a coalesced batch once it holds this many rows.
+PREDICTION_BATCH_MAX_WAIT_MS: float = float(os.getenv("PREDICTION_BATCH_MAX_WAIT_MS", 5))  # Flush a coalesced batch at the latest this long after its first request.
+PREDICTION_EXECUTOR_MAX_WORKERS: int = int(os.getenv("PREDICTION_EXECUTOR_MAX_WORKERS", 4))  # Size of the thread pool running inference off the event loop.
+PREDICTION_CSV_CHUNK_SIZE: int = int(os.getenv("PREDICTION_CSV_CHUNK_SIZE", 10000))          # Rows parsed and scored per chunk by the CSV bulk-scoring endpoint.
+PREDICTION_CACHE_MAX_SIZE: int = int(os.getenv("PREDICTION_CACHE_MAX_SIZE", 10000))          # Entries kept in the LRU prediction cache, 0 disables the cache.
+PREDICTION_CACHE_NUMERIC_BIN_WIDTH: float = float(os.getenv("PREDICTION_CACHE_NUMERIC_BIN_WIDTH", 0))  # Width of the bins numeric features are keyed on, 0 keys on exact values.
+METRICS_LATENCY_WINDOW_SIZE: int = int(os.getenv("METRICS_LATENCY_WINDOW_SIZE", 4096))          # Most recent observations per stage the /metrics quantiles are computed on.
+METRICS_LATENCY_QUANTILES: tuple = (0.5, 0.95, 0.99)                                          # Quantiles exposed per stage on /metrics.
+PREDICTION_NUMPY_MODEL_DIR: str = os.getenv("PREDICTION_NUMPY_MODEL_DIR")                       # Local NumPy model directory served memory-mapped instead of the S3 pickle when set.
+SHADOW_MODEL_VERSION: str = os.getenv("SHADOW_MODEL_VERSION")                                   # Registry version scored in shadow next to production, unset disables shadow scoring.
+SHADOW_MAX_WORKERS: int = int(os.getenv("SHADOW_MAX_WORKERS", 1))                                  # Background threads scoring the shadow batches.
+SHADOW_MAX_PENDING_BATCHES: int = int(os.getenv("SHADOW_MAX_PENDING_BATCHES", 8))                  # Queued shadow batches above which new ones are dropped instead of queued.
+SHADOW_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("SHADOW_FLUSH_INTERVAL_SECONDS", 60))       # Age of the aggregation window at which it is flushed to the log.
+PREDICTION_WARMUP_RETRY_SECONDS: float = float(os.getenv("PREDICTION_WARMUP_RETRY_SECONDS", 10))    # Delay before a failed startup warm-up (e.g. S3 unreachable) is retried.
+
+# Representative case pushed through the full USvisaModel.predict path by the startup warm-up.
+PREDICTION_WARMUP_RECORD: dict = {
+    "continent": "Asia",
+    "education_of_employee": "Bachelor's",
+    "has_job_experience": "Y",
+    "requires_job_training": "N",
+    "no_of_employees": 1000,
+    "region_of_employment": "Northeast",
+    "prevailing_wage": 70000.0,
+    "unit_of_wage": "Year",
+    "full_time_position": "Y",
+    "company_age": 20,
+}
+
+
+"""
+Logging related constants
+Read by US_Visa.logger when it configures the root logger.
+"""
+LOG_LEVEL: str = os.getenv("LOG_LEVEL", "DEBUG")                           # Level applied to every module without its own entry in LOG_MODULE_LEVELS.
+LOG_MODULE_LEVELS: str = os.getenv("LOG_MODULE_LEVELS", "")                # Per-module levels keyed on the file name, e.g. "estimator=WARNING,aws_storage=INFO".
+LOG_ASYNC: bool = os.getenv("LOG_ASYNC", "1") == "1"                       # Hand records to a background writer thread instead of writing the file inline.
+LOG_RATE_LIMIT_PER_SECOND: int = int(os.getenv("LOG_RATE_LIMIT_PER_SECOND", 0))  # Records below WARNING let through per call site and second, 0 disables rate limiting.
@@ -1,17 +1,52 @@
 # Import the MongoDBClient class that handles database connections
 from US_Visa.configuration.mongo_db_connection import MongoDBClient  
-# Import the constant for the database name from the constants file
-from US_Visa.constant import DATABASE_NAME  
+# Import the constants for the database name, the schema file and the export cursor batch size and partition sampling
+from US_Visa.constant import DATABASE_NAME, SCHEMA_FILE_PATH, DATA_INGESTION_EXPORT_BATCH_SIZE, \
+    DATA_INGESTION_PARTITION_SAMPLE_FACTOR  
+# Import os for the part file paths of the partitioned export
+import os  
+# Import the pools reading the partitions of the partitioned export
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor  
+
 # Import a custom exception class to wrap and raise exceptions in a consistent manner
 from US_Visa.exception import USvisaException  
 # Import pandas for handling data frames
 import pandas as pd  
 # Import sys to pass system-specific parameters (e.g., traceback info) in exception handling
 import sys  
-# Import Optional type hint for an optional parameter
-from typing import Optional  
+# Import Optional type hint for an optional parameter, Iterator for the batch generator and List for the part files
+from typing import Iterator, List, Optional  
 # Import numpy for numeric operations such as replacing specific values
 import numpy as np  
+# Import the YAML reader used to load the column schema driving the export, and the typed Parquet writer for part files
+from US_Visa.utils.main_utils import read_yaml_file, compact_dataframe, save_parquet_data  
+# Import logging to report the partitioned export
+from US_Visa.logger import logging  
+
+
+def init_export_worker() -> None:
+    """
+    Process pool initializer: drop the client inherited from the parent, pymongo clients are not fork safe,
+    so every worker process opens its own connection.
+    """
+    MongoDBClient.client = None
+
+
+def export_partition_to_parquet(collection_name: str, query: dict, part_file_path: str, batch_size: int,
+                                database_name: Optional[str] = None, schema_file_path: str = SCHEMA_FILE_PATH) -> int:
+    """
+    Export the documents of one partition and write them, typed from the schema, to their own part file.
+
+    Returns:
+        int: Number of documents written.
+    """
+    dataframe = USvisaData().export_collection_as_dataframe(collection_name=collection_name, database_name=database_name,
+                                                            batch_size=batch_size, schema_file_path=schema_file_path,
+                                                            query=query)
+    dataframe = compact_dataframe(dataframe, read_yaml_file(file_path=schema_file_path))
+    save_parquet_data(part_file_path, dataframe)
+    return len(dataframe)
+
 
 
 
@@ -36,18 +71,108 @@ class USvisaData:
             raise USvisaException(e, sys)
         
 
-    def export_collection_as_dataframe(self, collection_name: str, database_name: Optional[str] = None) -> pd.DataFrame:
+    @staticmethod
+    def get_schema_column_types(schema_file_path: str = SCHEMA_FILE_PATH) -> dict:
+        """
+        Read the "columns" section of the schema file.
+
+        Returns:
+            dict: Column name to schema type ("int", "float", "category", ...), in schema order.
+        """
+        schema_config = read_yaml_file(file_path=schema_file_path)
+        column_types = {}
+        for column in schema_config["columns"]:
+            column_types.update(column)
+        return column_types
+
+    @staticmethod
+    def _fill_column_buffer(buffer: np.ndarray, start: int, values: list, numeric: bool) -> None:
+        """
+        Write one cursor batch of a column into its preallocated buffer, mapping the "na" placeholder
+        (and, for numeric columns, any other non-number) to np.nan.
+        """
+        if numeric:
+            buffer[start:start + len(values)] = [
+                value if isinstance(value, (int, float)) and not isinstance(value, bool) else np.nan
+                for value in values
+            ]
+        else:
+            buffer[start:start + len(values)] = [np.nan if value == "na" else value for value in values]
+
+    def get_max_field_value(self, collection_name: str, field_name: str, database_name: Optional[str] = None):
+        """
+        Return the largest value of field_name in the collection, None if no document has it.
+        Served from an index when field_name is indexed, as "_id" always is.
+        """
+        try:
+            if database_name is None:
+                collection = self.mongo_client.database[collection_name]
+            else:
+                collection = self.mongo_client.client[database_name][collection_name]
+
+            document = collection.find_one({field_name: {"$exists": True}}, {field_name: 1},
+                                           sort=[(field_name, -1)])
+            return None if document is None else document[field_name]
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+    def get_collection_fingerprint(self, collection_name: str, watermark_field: str = "_id", use_db_hash: bool = False,
+                                   database_name: Optional[str] = None) -> dict:
+        """
+        Compute a cheap fingerprint of the collection without reading its documents: the document count
+        from the collection metadata and the max "_id" (plus the max watermark_field when it is another field,
+        e.g. an updated_at timestamp). With use_db_hash the server-side dbHash of the collection is added,
+        which also changes on in-place updates but makes the server read the whole collection.
+
+        Returns:
+            dict: Fingerprint, equal between two calls when the collection did not change.
+        """
+        try:
+            if database_name is None:
+                database = self.mongo_client.database
+            else:
+                database = self.mongo_client.client[database_name]
+            collection = database[collection_name]
+
+            fingerprint = {
+                "collection": collection_name,
+                "count": collection.estimated_document_count(),
+                "max_id": self.get_max_field_value(collection_name=collection_name, field_name="_id",
+                                                   database_name=database_name),
+            }
+            if watermark_field != "_id":
+                fingerprint[f"max_{watermark_field}"] = self.get_max_field_value(
+                    collection_name=collection_name, field_name=watermark_field, database_name=database_name)
+            if use_db_hash:
+                db_hash = database.command("dbHash", collections=[collection_name])
+                fingerprint["db_hash"] = db_hash["collections"].get(collection_name)
+            return fingerprint
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+    def export_collection_as_dataframe(self, collection_name: str, database_name: Optional[str] = None,
+                                       batch_size: int = DATA_INGESTION_EXPORT_BATCH_SIZE,
+                                       schema_file_path: str = SCHEMA_FILE_PATH,
+                                       query: Optional[dict] = None) -> pd.DataFrame:
         """
         Export an entire MongoDB collection as a pandas DataFrame.
-        
+
+        The export is streamed: the server only returns the schema columns (no "_id"), the cursor
+        hands back batch_size documents per round trip, and every batch is written straight into
+        one preallocated array per column, typed from the schema. Only one batch of documents is
+        held as Python dicts at a time.
+
         Parameters:
             collection_name (str): Name of the MongoDB collection to export.
             database_name (Optional[str]): Optional; if provided, use this database,
                                            otherwise use the default from mongo_client.
-        
+            batch_size (int): Number of documents per cursor round trip and per buffer write.
+            schema_file_path (str): Schema whose "columns" section selects and types the exported fields.
+            query (Optional[dict]): Optional; filter selecting the exported documents, all of them if None.
+
         Returns:
-            pd.DataFrame: DataFrame containing all documents from the specified collection,
-                          with the "_id" column dropped and "na" strings replaced with np.nan.
+            pd.DataFrame: DataFrame of the schema columns of all documents, with "na" strings replaced with np.nan.
+                          Numeric columns without missing or fractional values are returned as int64.
         """
         try:
             # Determine which database to use: if a database_name is provided, use it; 
@@ -55,20 +180,201 @@ class USvisaData:
             if database_name is None:
                 collection = self.mongo_client.database[collection_name]
             else:
-                collection = self.mongo_client[database_name][collection_name]
-
-            # Retrieve all documents in the collection, convert the cursor to a list, and then into a DataFrame.
-            df = pd.DataFrame(list(collection.find()))
-            
-            # If the DataFrame contains the MongoDB default "_id" field, drop it as it's not needed.
-            if "_id" in df.columns.to_list():
-                df = df.drop(columns=["_id"], axis=1)
-            
-            # Replace any occurrence of the string "na" with numpy's NaN for consistent missing data representation.
-            df.replace({"na": np.nan}, inplace=True)
-            
+                collection = self.mongo_client.client[database_name][collection_name]
+
+            column_types = self.get_schema_column_types(schema_file_path=schema_file_path)
+            numeric_columns = {column for column, column_type in column_types.items() if column_type in ("int", "float")}
+
+            # Preallocate the typed buffers from the collection metadata count, which costs no scan;
+            # a filtered export starts from one batch instead of counting its matches with a second scan.
+            # The buffers grow as documents are read, and are trimmed to the rows actually read.
+            query = {} if query is None else query
+            capacity = max(collection.estimated_document_count() if not query else batch_size, 1)
+            buffers = {column: np.empty(capacity, dtype=np.float64 if column in numeric_columns else object)
+                       for column in column_types}
+            seen_columns = set()
+
+            projection = {"_id": 0, **{column: 1 for column in column_types}}
+            cursor = collection.find(query, projection, batch_size=batch_size)
+            rows = 0
+            documents = []
+
+            def flush_documents():
+                nonlocal capacity
+                if rows + len(documents) > capacity:
+                    capacity = max(2 * capacity, rows + len(documents))
+                    for column in buffers:
+                        buffers[column] = np.resize(buffers[column], capacity)
+                for column, buffer in buffers.items():
+                    values = [document.get(column, "na") for document in documents]
+                    self._fill_column_buffer(buffer, rows, values, numeric=column in numeric_columns)
+                for document in documents:
+                    seen_columns.update(document)
+
+            for document in cursor:
+                documents.append(document)
+                if len(documents) == batch_size:
+                    flush_documents()
+                    rows += len(documents)
+                    documents = []
+            if len(documents) > 0:
+                flush_documents()
+                rows += len(documents)
+
+            # Keep the columns the collection actually has, like the document-by-document export did.
+            df = pd.DataFrame({column: buffer[:rows] for column, buffer in buffers.items() if column in seen_columns},
+                              copy=False)
+            for column in numeric_columns.intersection(df.columns):
+                values = df[column].to_numpy()
+                if not np.isnan(values).any() and np.array_equal(values, np.floor(values)):
+                    df[column] = values.astype(np.int64)
+
             # Return the cleaned DataFrame.
             return df
         except Exception as e:
             # Wrap and raise any exception encountered using the custom USvisaException.
             raise USvisaException(e, sys)
+
+    def get_id_partition_bounds(self, collection_name: str, n_partitions: int, query: Optional[dict] = None,
+                                sample_factor: int = DATA_INGESTION_PARTITION_SAMPLE_FACTOR,
+                                database_name: Optional[str] = None) -> list:
+        """
+        Place the bounds splitting the documents matching query into n_partitions "_id" ranges of similar size.
+        ObjectIds are not evenly spread between the min and the max "_id", so the bounds are the quantiles
+        of a server-side $sample of n_partitions * sample_factor "_id" values instead.
+
+        Returns:
+            list: Sorted, distinct inner bounds, at most n_partitions - 1 of them.
+        """
+        try:
+            if database_name is None:
+                collection = self.mongo_client.database[collection_name]
+            else:
+                collection = self.mongo_client.client[database_name][collection_name]
+
+            pipeline = [{"$match": {} if query is None else query},
+                        {"$sample": {"size": n_partitions * sample_factor}},
+                        {"$project": {"_id": 1}}]
+            sample = sorted(document["_id"] for document in collection.aggregate(pipeline))
+            if len(sample) == 0 or n_partitions <= 1:
+                return []
+            bounds = [sample[len(sample) * partition // n_partitions] for partition in range(1, n_partitions)]
+            # A small sample can repeat a bound, which would leave an empty partition
+            return sorted(set(bounds))
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+    @staticmethod
+    def get_partition_queries(bounds: list, query: Optional[dict] = None) -> List[dict]:
+        """
+        Turn the inner bounds into one query per "_id" range, open at both ends so no document is missed.
+        """
+        edges = [None] + list(bounds) + [None]
+        partition_queries = []
+        for lower, upper in zip(edges[:-1], edges[1:]):
+            id_range = {}
+            if lower is not None:
+                id_range["$gte"] = lower
+            if upper is not None:
+                id_range["$lt"] = upper
+            partition_query = {"_id": id_range} if id_range else {}
+            if query:
+                partition_query = {"$and": [query, partition_query]} if partition_query else query
+            partition_queries.append(partition_query)
+        return partition_queries
+
+    def export_collection_partitioned(self, collection_name: str, output_dir: str, n_partitions: int,
+                                      max_workers: int, query: Optional[dict] = None,
+                                      batch_size: int = DATA_INGESTION_EXPORT_BATCH_SIZE,
+                                      executor: str = "process", database_name: Optional[str] = None,
+                                      schema_file_path: str = SCHEMA_FILE_PATH) -> List[str]:
+        """
+        Export the documents matching query as n_partitions "_id" ranges read concurrently, each through its
+        own cursor, and written straight to its own typed Parquet part file in output_dir.
+
+        Parameters:
+            collection_name (str): Name of the MongoDB collection to export.
+            output_dir (str): Directory the part-NNNNN.parquet files are written to, emptied of old parts first.
+            n_partitions (int): Number of "_id" ranges.
+            max_workers (int): Number of partitions read at the same time.
+            query (Optional[dict]): Optional; filter selecting the exported documents, all of them if None.
+            batch_size (int): Number of documents per cursor round trip.
+            executor (str): "process" to decode BSON on several cores, "thread" to stay in this process.
+            database_name (Optional[str]): Optional; if provided, use this database,
+                                           otherwise use the default from mongo_client.
+            schema_file_path (str): Schema whose "columns" section selects and types the exported fields.
+
+        Returns:
+            List[str]: Part file paths in "_id" order.
+        """
+        try:
+            if database_name is None:
+                collection = self.mongo_client.database[collection_name]
+            else:
+                collection = self.mongo_client.client[database_name][collection_name]
+
+            bounds = self.get_id_partition_bounds(collection_name=collection_name, n_partitions=n_partitions,
+                                                  query=query, database_name=database_name)
+            partition_queries = self.get_partition_queries(bounds, query=query)
+
+            os.makedirs(output_dir, exist_ok=True)
+            for file_name in os.listdir(output_dir):
+                if file_name.startswith("part-"):
+                    os.remove(os.path.join(output_dir, file_name))
+            part_file_paths = [os.path.join(output_dir, f"part-{partition:05d}.parquet")
+                               for partition in range(len(partition_queries))]
+
+            logging.info(f"Exporting collection [{collection_name}] as {len(partition_queries)} _id partitions "
+                         f"with {max_workers} {executor} workers")
+            if executor == "process":
+                pool = ProcessPoolExecutor(max_workers=max_workers, initializer=init_export_worker)
+            else:
+                pool = ThreadPoolExecutor(max_workers=max_workers)
+            with pool:
+                futures = [pool.submit(export_partition_to_parquet, collection_name, partition_query, part_file_path,
+                                       batch_size, database_name, schema_file_path)
+                           for partition_query, part_file_path in zip(partition_queries, part_file_paths)]
+                rows = sum(future.result() for future in futures)
+
+            # Documents updated while the partitions were read can move in or out of query.
+            expected_rows = collection.count_documents({} if query is None else query)
+            if rows != expected_rows:
+                logging.warning(f"Partitioned export wrote {rows} documents, the query now matches {expected_rows}")
+            logging.info(f"Exported {rows} documents into {len(part_file_paths)} part files in [{output_dir}]")
+            return part_file_paths
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+    def iter_collection_batches(self, collection_name: str, batch_size: int,
+                                database_name: Optional[str] = None) -> Iterator[pd.DataFrame]:
+        """
+        Read a MongoDB collection through a single cursor and yield it as DataFrames of batch_size rows.
+
+        Parameters:
+            collection_name (str): Name of the MongoDB collection to read.
+            batch_size (int): Number of documents per yielded DataFrame, also used as the cursor batch size.
+            database_name (Optional[str]): Optional; if provided, use this database,
+                                           otherwise use the default from mongo_client.
+
+        Yields:
+            pd.DataFrame: Cleaned like export_collection_as_dataframe, "_id" dropped and "na" replaced with np.nan.
+        """
+        try:
+            if database_name is None:
+                collection = self.mongo_client.database[collection_name]
+            else:
+                collection = self.mongo_client.client[database_name][collection_name]
+
+            # Leave "_id" out on the server instead of dropping it from every batch.
+            cursor = collection.find({}, {"_id": 0}, batch_size=batch_size)
+            documents = []
+            for document in cursor:
+                documents.append(document)
+                if len(documents) == batch_size:
+                    yield pd.DataFrame(documents).replace({"na": np.nan})
+                    documents = []
+            if len(documents) > 0:
+                yield pd.DataFrame(documents).replace({"na": np.nan})
+        except Exception as e:
+            raise USvisaException(e, sys)
+
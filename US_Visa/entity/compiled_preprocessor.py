@@ -0,0 +1,286 @@
+import math
+import sys
+from typing import List
+
+import numpy as np
+from pandas import DataFrame
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, PowerTransformer, StandardScaler
+
+from US_Visa.exception import USvisaException
+from US_Visa.logger import logging
+
+
+class CompiledPreprocessor:
+    """
+    This class is a flat NumPy copy of the fitted ColumnTransformer built by
+    DataTransformation.get_data_transformer_object. It holds the category tables of the
+    OneHot and Ordinal encoders, the fitted Yeo-Johnson lambdas and the StandardScaler
+    mean/scale vectors, and transforms rows without going through sklearn.
+    """
+
+    def __init__(self, n_output_features: int,
+                 onehot_columns: List[str], onehot_categories: List[np.ndarray], onehot_offsets: np.ndarray,
+                 ordinal_columns: List[str], ordinal_categories: List[np.ndarray], ordinal_output_index: np.ndarray,
+                 numeric_columns: List[str], numeric_output_index: np.ndarray, yeo_johnson_lambdas: np.ndarray,
+                 numeric_mean: np.ndarray, numeric_scale: np.ndarray):
+        """
+        :param n_output_features: Width of the transformed feature matrix
+        :param onehot_columns: Input column of every one-hot encoded feature
+        :param onehot_categories: Fitted categories of every one-hot column
+        :param onehot_offsets: Output index of the first category of every one-hot column
+        :param ordinal_columns: Input column of every ordinal encoded feature
+        :param ordinal_categories: Fitted categories of every ordinal column, the position is the code
+        :param ordinal_output_index: Output index of every ordinal column
+        :param numeric_columns: Input column of every numeric output, a column may appear more than once
+        :param numeric_output_index: Output index of every numeric output
+        :param yeo_johnson_lambdas: Fitted Yeo-Johnson lambda of every numeric output, NaN if not power transformed
+        :param numeric_mean: Mean subtracted from every numeric output after the power transform
+        :param numeric_scale: Scale dividing every numeric output after the mean is subtracted
+        """
+        self.n_output_features = int(n_output_features)
+        self.onehot_columns = list(onehot_columns)
+        self.onehot_categories = [np.asarray(categories, dtype=object) for categories in onehot_categories]
+        self.onehot_offsets = np.asarray(onehot_offsets, dtype=np.int64)
+        self.ordinal_columns = list(ordinal_columns)
+        self.ordinal_categories = [np.asarray(categories, dtype=object) for categories in ordinal_categories]
+        self.ordinal_output_index = np.asarray(ordinal_output_index, dtype=np.int64)
+        self.numeric_columns = list(numeric_columns)
+        self.numeric_output_index = np.asarray(numeric_output_index, dtype=np.int64)
+        self.yeo_johnson_lambdas = np.asarray(yeo_johnson_lambdas, dtype=np.float64)
+        self.numeric_mean = np.asarray(numeric_mean, dtype=np.float64)
+        self.numeric_scale = np.asarray(numeric_scale, dtype=np.float64)
+        self._build_lookup_tables()
+
+    def _build_lookup_tables(self) -> None:
+        """
+        Build the category -> output column dictionaries used by both transform paths
+        """
+        self._onehot_plan = [
+            (column, {category: int(offset) + position for position, category in enumerate(categories)})
+            for column, categories, offset in zip(self.onehot_columns, self.onehot_categories, self.onehot_offsets)
+        ]
+        self._ordinal_plan = [
+            (column, int(output_index), {category: float(code) for code, category in enumerate(categories)})
+            for column, categories, output_index in zip(self.ordinal_columns, self.ordinal_categories,
+                                                        self.ordinal_output_index)
+        ]
+        self._numeric_plan = [
+            (column, int(output_index), float(lmbda), float(mean), float(scale))
+            for column, output_index, lmbda, mean, scale in zip(self.numeric_columns, self.numeric_output_index,
+                                                                self.yeo_johnson_lambdas, self.numeric_mean,
+                                                                self.numeric_scale)
+        ]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for key in ("_onehot_plan", "_ordinal_plan", "_numeric_plan"):
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._build_lookup_tables()
+
+    @classmethod
+    def from_column_transformer(cls, preprocessor: ColumnTransformer) -> "CompiledPreprocessor":
+        """
+        Method Name :   from_column_transformer
+        Description :   This method compiles a fitted ColumnTransformer into flat lookup structures
+
+        Output      :   CompiledPreprocessor equivalent to preprocessor.transform
+        On Failure  :   Raises NotImplementedError for transformers that cannot be compiled
+        """
+        onehot_columns, onehot_categories, onehot_offsets = [], [], []
+        ordinal_columns, ordinal_categories, ordinal_output_index = [], [], []
+        numeric_columns, numeric_output_index, lambdas, means, scales = [], [], [], [], []
+
+        for name, transformer, columns in preprocessor.transformers_:
+            output_slice = preprocessor.output_indices_[name]
+            if output_slice.stop == output_slice.start:
+                continue
+
+            if isinstance(transformer, OneHotEncoder):
+                if transformer.drop is not None or transformer.handle_unknown != "error" \
+                        or getattr(transformer, "infrequent_categories_", None) is not None:
+                    raise NotImplementedError(f"OneHotEncoder settings of [{name}] are not supported")
+                offset = output_slice.start
+                for column, categories in zip(columns, transformer.categories_):
+                    onehot_columns.append(column)
+                    onehot_categories.append(categories)
+                    onehot_offsets.append(offset)
+                    offset += len(categories)
+
+            elif isinstance(transformer, OrdinalEncoder):
+                if transformer.handle_unknown != "error":
+                    raise NotImplementedError(f"OrdinalEncoder settings of [{name}] are not supported")
+                for position, (column, categories) in enumerate(zip(columns, transformer.categories_)):
+                    ordinal_columns.append(column)
+                    ordinal_categories.append(categories)
+                    ordinal_output_index.append(output_slice.start + position)
+
+            else:
+                steps = transformer.steps if isinstance(transformer, Pipeline) else [(name, transformer)]
+                column_lambdas = np.full(len(columns), np.nan)
+                column_means = np.zeros(len(columns))
+                column_scales = np.ones(len(columns))
+                for position, (_, step) in enumerate(steps):
+                    if isinstance(step, PowerTransformer) and step.method == "yeo-johnson" and position == 0:
+                        column_lambdas = step.lambdas_.astype(np.float64)
+                        if step.standardize:
+                            column_means = step._scaler.mean_.astype(np.float64)
+                            column_scales = step._scaler.scale_.astype(np.float64)
+                    elif isinstance(step, StandardScaler) and len(steps) == 1:
+                        if step.with_mean:
+                            column_means = step.mean_.astype(np.float64)
+                        if step.with_std:
+                            column_scales = step.scale_.astype(np.float64)
+                    elif isinstance(step, str) and step == "passthrough" and len(steps) == 1:
+                        pass
+                    else:
+                        raise NotImplementedError(f"Transformer [{name}] of type {type(step).__name__} is not supported")
+
+                for position, column in enumerate(columns):
+                    numeric_columns.append(column)
+                    numeric_output_index.append(output_slice.start + position)
+                    lambdas.append(column_lambdas[position])
+                    means.append(column_means[position])
+                    scales.append(column_scales[position])
+
+        n_output_features = max(output_slice.stop for output_slice in preprocessor.output_indices_.values())
+
+        return cls(n_output_features=n_output_features,
+                   onehot_columns=onehot_columns, onehot_categories=onehot_categories, onehot_offsets=onehot_offsets,
+                   ordinal_columns=ordinal_columns, ordinal_categories=ordinal_categories,
+                   ordinal_output_index=ordinal_output_index,
+                   numeric_columns=numeric_columns, numeric_output_index=numeric_output_index,
+                   yeo_johnson_lambdas=lambdas, numeric_mean=means, numeric_scale=scales)
+
+    @staticmethod
+    def _yeo_johnson(x: np.ndarray, lmbda: float) -> np.ndarray:
+        """
+        Vectorised Yeo-Johnson transform, same branches as sklearn's PowerTransformer
+        """
+        out = np.zeros_like(x)
+        pos = x >= 0
+        if abs(lmbda) < np.spacing(1.0):
+            out[pos] = np.log1p(x[pos])
+        else:
+            out[pos] = (np.power(x[pos] + 1, lmbda) - 1) / lmbda
+        if abs(lmbda - 2) > np.spacing(1.0):
+            out[~pos] = -(np.power(-x[~pos] + 1, 2 - lmbda) - 1) / (2 - lmbda)
+        else:
+            out[~pos] = -np.log1p(-x[~pos])
+        return out
+
+    @staticmethod
+    def _yeo_johnson_scalar(x: float, lmbda: float) -> float:
+        if x >= 0:
+            if abs(lmbda) < np.spacing(1.0):
+                return math.log1p(x)
+            return ((x + 1) ** lmbda - 1) / lmbda
+        if abs(lmbda - 2) > np.spacing(1.0):
+            return -((-x + 1) ** (2 - lmbda) - 1) / (2 - lmbda)
+        return -math.log1p(-x)
+
+    @staticmethod
+    def record_from_frame(dataframe: DataFrame) -> dict:
+        """
+        First row of dataframe as a record for transform_record, read from the column arrays of every
+        pandas block: to_numpy(dtype=object) would first copy all blocks into a new object matrix
+        Returns: dict of column name -> raw value
+        """
+        columns = dataframe.columns.tolist()
+        record = {}
+        for block in dataframe._mgr.blocks:
+            values = block.values
+            if values.ndim == 1:
+                # Extension arrays (e.g. categorical columns) are one block per column.
+                first_row = [values[0]]
+            elif isinstance(values, np.ndarray):
+                first_row = values[:, 0].tolist()
+            else:
+                first_row = list(values[:, 0])
+            record.update(zip([columns[position] for position in block.mgr_locs.as_array.tolist()], first_row))
+        return record
+
+    def transform_record(self, record: dict) -> np.ndarray:
+        """
+        Transform a single record given as a dict of raw feature values, without pandas
+        Returns: 1-D array of n_output_features values
+        """
+        out = np.zeros(self.n_output_features)
+        try:
+            for column, table in self._onehot_plan:
+                out[table[record[column]]] = 1.0
+            for column, output_index, table in self._ordinal_plan:
+                out[output_index] = table[record[column]]
+        except KeyError as e:
+            raise ValueError(f"Found unknown category {e} during transform")
+
+        for column, output_index, lmbda, mean, scale in self._numeric_plan:
+            value = float(record[column])
+            if lmbda == lmbda:
+                value = self._yeo_johnson_scalar(value, lmbda)
+            out[output_index] = (value - mean) / scale
+        return out
+
+    def transform(self, dataframe: DataFrame) -> np.ndarray:
+        """
+        Transform every row of dataframe, column by column
+        Returns: 2-D array of shape (len(dataframe), n_output_features)
+        """
+        try:
+            n_rows = len(dataframe)
+            out = np.zeros((n_rows, self.n_output_features))
+            rows = np.arange(n_rows)
+
+            try:
+                for column, table in self._onehot_plan:
+                    values = dataframe[column].to_numpy()
+                    out[rows, np.fromiter(map(table.__getitem__, values), dtype=np.int64, count=n_rows)] = 1.0
+                for column, output_index, table in self._ordinal_plan:
+                    values = dataframe[column].to_numpy()
+                    out[:, output_index] = np.fromiter(map(table.__getitem__, values), dtype=np.float64, count=n_rows)
+            except KeyError as e:
+                raise ValueError(f"Found unknown category {e} during transform")
+
+            for column, output_index, lmbda, mean, scale in self._numeric_plan:
+                values = dataframe[column].to_numpy(dtype=np.float64)
+                if lmbda == lmbda:
+                    values = self._yeo_johnson(values, lmbda)
+                out[:, output_index] = (values - mean) / scale
+            return out
+
+        except Exception as e:
+            raise USvisaException(e, sys) from e
+
+    def verify(self, preprocessor: ColumnTransformer, dataframe: DataFrame, atol: float = 1e-8) -> float:
+        """
+        Method Name :   verify
+        Description :   This method checks the compiled output against preprocessor.transform on dataframe,
+                        both for the vectorised and the per-record path
+
+        Output      :   Returns the largest absolute difference found
+        On Failure  :   Raises a USvisaException if any value differs by more than atol
+        """
+        try:
+            expected = preprocessor.transform(dataframe)
+            if hasattr(expected, "toarray"):
+                expected = expected.toarray()
+            compiled = self.transform(dataframe)
+            max_difference = float(np.max(np.abs(expected - compiled))) if expected.size else 0.0
+
+            sample = dataframe.head(100).to_dict(orient="records")
+            for position, record in enumerate(sample):
+                max_difference = max(max_difference,
+                                     float(np.max(np.abs(expected[position] - self.transform_record(record)))))
+
+            logging.info(f"Compiled preprocessor max absolute difference to sklearn: {max_difference}")
+            if not max_difference <= atol:
+                raise ValueError(f"Compiled preprocessor differs from sklearn by {max_difference} (atol={atol})")
+            return max_difference
+
+        except Exception as e:
+            raise USvisaException(e, sys) from e
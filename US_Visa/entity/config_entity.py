@@ -2,6 +2,7 @@ import os
 from US_Visa.constant import *
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Optional
 
 # Generate a unique timestamp string used to version the artifacts for each pipeline run.
 TIMESTAMP: str = datetime.now().strftime("%m_%d_%Y_%H_%M_%S")
@@ -30,8 +31,30 @@ class DataIngestionConfig:
     testing_file_path: str = os.path.join(data_ingestion_dir, DATA_INGESTION_INGESTED_DIR, TEST_FILE_NAME)
     # Specify the proportion of the data that will be split into testing data.
     train_test_split_ratio: float = DATA_INGESTION_TRAIN_TEST_SPLIT_RATIO
+    # Split mode ("hash" on case_id, or "random"), the hash key and the optional exact, non-stable
+    # stratification on the target (the hash split is already stratified in expectation).
+    split_mode: str = DATA_INGESTION_SPLIT_MODE
+    split_exact_stratify: bool = DATA_INGESTION_SPLIT_EXACT_STRATIFY
+    split_hash_key: str = DATA_INGESTION_SPLIT_HASH_KEY
     # Define the MongoDB collection name for data ingestion.
     collection_name: str = DATA_INGESTION_COLLECTION_NAME
+    # Number of documents fetched per cursor round trip by the streaming export.
+    export_batch_size: int = DATA_INGESTION_EXPORT_BATCH_SIZE
+    # Incremental ingestion: only documents past the watermark are fetched and merged by case_id
+    # into the feature store kept across runs.
+    incremental: bool = DATA_INGESTION_INCREMENTAL
+    watermark_field: str = DATA_INGESTION_WATERMARK_FIELD
+    persistent_feature_store_file_path: str = os.path.join(DATA_INGESTION_STATE_DIR, FILE_NAME)
+    watermark_file_path: str = os.path.join(DATA_INGESTION_STATE_DIR, DATA_INGESTION_WATERMARK_FILE_NAME)
+    # Ingestion cache: fingerprint of the collection and settings, compared with the last run to reuse its artifacts.
+    reuse_unchanged: bool = DATA_INGESTION_REUSE_UNCHANGED
+    fingerprint_db_hash: bool = DATA_INGESTION_FINGERPRINT_DB_HASH
+    fingerprint_file_path: str = os.path.join(DATA_INGESTION_STATE_DIR, DATA_INGESTION_FINGERPRINT_FILE_NAME)
+    # Parallel export: number of _id range partitions, their pool and the directory of their part files.
+    export_partitions: int = DATA_INGESTION_EXPORT_PARTITIONS
+    export_max_workers: int = DATA_INGESTION_EXPORT_MAX_WORKERS
+    export_executor: str = DATA_INGESTION_EXPORT_EXECUTOR
+    feature_store_parts_dir: str = os.path.join(data_ingestion_dir, DATA_INGESTION_FEATURE_STORE_DIR, DATA_INGESTION_FEATURE_STORE_PARTS_DIR)
 
 
 @dataclass
@@ -43,9 +66,10 @@ class DataValidationConfig:
 @dataclass
 class DataTransformationConfig:
     data_transformation_dir: str = os.path.join(training_pipeline_config.artifact_dir, DATA_TRANSFORMATION_DIR_NAME)
-    transformed_train_file_path: str = os.path.join(data_transformation_dir, DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR,TRAIN_FILE_NAME.replace("csv", "npy"))
-    transformed_test_file_path: str = os.path.join(data_transformation_dir, DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR,TEST_FILE_NAME.replace("csv", "npy"))
+    transformed_train_file_path: str = os.path.join(data_transformation_dir, DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR,os.path.splitext(TRAIN_FILE_NAME)[0] + ".npy")
+    transformed_test_file_path: str = os.path.join(data_transformation_dir, DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR,os.path.splitext(TEST_FILE_NAME)[0] + ".npy")
     transformed_object_file_path: str = os.path.join(data_transformation_dir,DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR,PREPROCSSING_OBJECT_FILE_NAME)
+    compiled_object_file_path: str = os.path.join(data_transformation_dir,DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR,COMPILED_PREPROCESSING_OBJECT_FILE_NAME)
     
 
 @dataclass
@@ -54,6 +78,8 @@ class ModelTrainerConfig:
     trained_model_file_path: str = os.path.join(model_trainer_dir, MODEL_TRAINER_TRAINED_MODEL_DIR, MODEL_FILE_NAME)
     expected_accuracy: float = MODEL_TRAINER_EXPECTED_SCORE
     model_config_file_path: str = MODEL_TRAINER_MODEL_CONFIG_FILE_PATH
+    numpy_model_dir: str = os.path.join(model_trainer_dir, MODEL_TRAINER_NUMPY_MODEL_DIR)
+    decision_threshold: Optional[float] = None if MODEL_TRAINER_DECISION_THRESHOLD is None else float(MODEL_TRAINER_DECISION_THRESHOLD)
 
 
 @dataclass
@@ -68,6 +94,9 @@ class ModelEvaluationConfig:
 class ModelPusherConfig:
     bucket_name: str = MODEL_BUCKET_NAME
     s3_model_key_path: str = MODEL_FILE_NAME
+    registry_key_prefix: str = MODEL_PUSHER_S3_KEY
+    # Sortable version name of the model pushed by this pipeline run.
+    model_version: str = datetime.now().strftime("%Y%m%d_%H%M%S")
 
 
 
@@ -75,3 +104,36 @@ class ModelPusherConfig:
 class USvisaPredictorConfig:
     model_file_path: str = MODEL_FILE_NAME
     model_bucket_name: str = MODEL_BUCKET_NAME
+    numpy_model_dir: Optional[str] = PREDICTION_NUMPY_MODEL_DIR
+    registry_key_prefix: str = MODEL_PUSHER_S3_KEY
+    max_resident_models: int = MODEL_REGISTRY_MAX_RESIDENT_MODELS
+
+
+@dataclass
+class PredictionBatcherConfig:
+    max_batch_size: int = PREDICTION_BATCH_MAX_SIZE
+    max_wait_ms: float = PREDICTION_BATCH_MAX_WAIT_MS
+
+
+@dataclass
+class PredictionCacheConfig:
+    max_size: int = PREDICTION_CACHE_MAX_SIZE
+    numeric_bin_width: float = PREDICTION_CACHE_NUMERIC_BIN_WIDTH
+
+
+@dataclass
+class ShadowScoringConfig:
+    candidate_version: Optional[str] = SHADOW_MODEL_VERSION
+    max_workers: int = SHADOW_MAX_WORKERS
+    max_pending_batches: int = SHADOW_MAX_PENDING_BATCHES
+    flush_interval_seconds: float = SHADOW_FLUSH_INTERVAL_SECONDS
+
+
+@dataclass
+class BatchPredictionConfig:
+    input_collection_name: str = DATA_INGESTION_COLLECTION_NAME
+    output_collection_name: str = BATCH_PREDICTION_COLLECTION_NAME
+    batch_size: int = BATCH_PREDICTION_BATCH_SIZE
+    max_workers: int = os.cpu_count() or 1
+    model_file_path: Optional[str] = None
+
@@ -1,10 +1,12 @@
 import sys
 
+import numpy as np
 from pandas import DataFrame
 from sklearn.pipeline import Pipeline
 
 from US_Visa.exception import USvisaException
 from US_Visa.logger import logging
+from US_Visa.utils.metrics import latency_metrics
 
 
 
@@ -21,13 +23,37 @@ class TargetValueMapping:
 
 
 class USvisaModel:
-    def __init__(self, preprocessing_object: Pipeline, trained_model_object: object):
+    def __init__(self, preprocessing_object: Pipeline, trained_model_object: object,
+                 compiled_preprocessing_object: object = None, decision_threshold: float = None):
         """
         :param preprocessing_object: Input Object of preprocesser
         :param trained_model_object: Input Object of trained model 
+        :param compiled_preprocessing_object: Optional CompiledPreprocessor used instead of preprocessing_object
+        :param decision_threshold: Optional score of class 1 from which a row is predicted as 1,
+                                   None keeps the trained model's own predict
         """
         self.preprocessing_object = preprocessing_object
         self.trained_model_object = trained_model_object
+        self.compiled_preprocessing_object = compiled_preprocessing_object
+        self.decision_threshold = decision_threshold
+
+    def transform(self, dataframe: DataFrame):
+        """
+        Transforms raw inputs with the compiled preprocessor when available, else with the sklearn one.
+        Single-row inputs go through the pandas-free transform_record, the column-wise transform
+        costs more than the whole record path for one row
+        """
+        # Models pickled before the compiled preprocessor existed do not have the attribute.
+        compiled_preprocessing_object = getattr(self, "compiled_preprocessing_object", None)
+        if compiled_preprocessing_object is not None:
+            if len(dataframe) == 1:
+                try:
+                    record = compiled_preprocessing_object.record_from_frame(dataframe)
+                    return compiled_preprocessing_object.transform_record(record)[None, :]
+                except Exception as e:
+                    raise USvisaException(e, sys) from e
+            return compiled_preprocessing_object.transform(dataframe)
+        return self.preprocessing_object.transform(dataframe)
 
     def predict(self, dataframe: DataFrame) -> DataFrame:
         """
@@ -40,14 +66,56 @@ class USvisaModel:
         try:
             logging.info("Using the trained model to get predictions")
 
-            transformed_feature = self.preprocessing_object.transform(dataframe)
+            with latency_metrics.timer("preprocess_transform"):
+                transformed_feature = self.transform(dataframe)
 
             logging.info("Used the trained model to get predictions")
-            return self.trained_model_object.predict(transformed_feature)
+            # Models pickled before the decision threshold existed do not have the attribute.
+            if getattr(self, "decision_threshold", None) is None:
+                with latency_metrics.timer("model_predict"):
+                    return self.trained_model_object.predict(transformed_feature)
+
+            with latency_metrics.timer("model_predict"):
+                probabilities = self.trained_model_object.predict_proba(transformed_feature)
+            return self.labels_from_proba(probabilities)
+
+        except Exception as e:
+            raise USvisaException(e, sys) from e
+
+    def predict_proba(self, dataframe: DataFrame) -> np.ndarray:
+        """
+        Function accepts raw inputs of a whole batch and returns the class probabilities of every row
+        in one call, columns ordered like the trained model's classes_
+        """
+        try:
+            with latency_metrics.timer("preprocess_transform"):
+                transformed_feature = self.transform(dataframe)
+
+            with latency_metrics.timer("model_predict_proba"):
+                return self.trained_model_object.predict_proba(transformed_feature)
 
         except Exception as e:
             raise USvisaException(e, sys) from e
 
+    def scores_from_proba(self, probabilities: np.ndarray) -> np.ndarray:
+        """
+        Returns: the probability of class 1 of every row, the score the decision threshold applies to
+        """
+        classes = np.asarray(self.trained_model_object.classes_)
+        return probabilities[:, int(np.flatnonzero(classes == 1)[0])]
+
+    def labels_from_proba(self, probabilities: np.ndarray) -> np.ndarray:
+        """
+        Returns: the label of every row, class 1 when its score reaches decision_threshold,
+                 the most probable class like the trained model's predict when no threshold is set
+        """
+        classes = np.asarray(self.trained_model_object.classes_)
+        decision_threshold = getattr(self, "decision_threshold", None)
+        if decision_threshold is None:
+            return classes.take(np.argmax(probabilities, axis=1), axis=0)
+        positive = self.scores_from_proba(probabilities) >= decision_threshold
+        return np.where(positive, classes[classes == 1][0], classes[classes != 1][0])
+
     def __repr__(self):
         return f"{type(self.trained_model_object).__name__}()"
 
@@ -0,0 +1,522 @@
+import json
+import os
+import shutil
+import sys
+import time
+from typing import Dict
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.neighbors import KDTree, KNeighborsClassifier
+
+from US_Visa.constant import NUMPY_MODEL_FORMAT_VERSION, NUMPY_MODEL_MANIFEST_FILE_NAME, KNN_INDEX_LEAVES_PER_ROUND, \
+    KNN_INDEX_MIN_LEAVES_PER_ROUND, KNN_INDEX_SEED_LEVELS, KNN_INDEX_LEVELS_PER_STEP
+from US_Visa.entity.compiled_preprocessor import CompiledPreprocessor
+from US_Visa.entity.estimator import USvisaModel
+from US_Visa.exception import USvisaException
+from US_Visa.logger import logging
+
+
+def compact_float_array(array: np.ndarray) -> np.ndarray:
+    """
+    Returns: array as float32 when every value survives the round trip exactly, else as float64
+    """
+    array = np.asarray(array, dtype=np.float64)
+    compact = array.astype(np.float32)
+    if np.array_equal(compact.astype(np.float64), array, equal_nan=True):
+        return compact
+    return array
+
+
+class NumpyRandomForestClassifier:
+    """
+    This class is the flat array form of a fitted RandomForestClassifier.
+    The nodes of all trees are concatenated, children hold global node indices (-1 for leaves)
+    and value holds the class distribution of every node, normalized like sklearn's predict_proba.
+    """
+    model_type = "random_forest"
+
+    def __init__(self, classes: np.ndarray, roots: np.ndarray, feature: np.ndarray, threshold: np.ndarray,
+                 children_left: np.ndarray, children_right: np.ndarray, value: np.ndarray, max_depth: int):
+        self.classes = classes
+        self.roots = roots
+        self.feature = feature
+        self.threshold = threshold
+        self.children_left = children_left
+        self.children_right = children_right
+        self.value = value
+        self.max_depth = int(max_depth)
+
+    @classmethod
+    def from_sklearn(cls, model: RandomForestClassifier, value_dtype=np.float32) -> "NumpyRandomForestClassifier":
+        if model.n_outputs_ != 1:
+            raise NotImplementedError("Multi-output random forests are not supported")
+        roots, features, thresholds, lefts, rights, values = [], [], [], [], [], []
+        offset = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            value = tree.value[:, 0, :].astype(np.float64)
+            value = value / value.sum(axis=1, keepdims=True)
+            roots.append(offset)
+            features.append(tree.feature)
+            # Thresholds stay float64, they sit between float32 feature values and must compare exactly.
+            thresholds.append(tree.threshold)
+            lefts.append(np.where(tree.children_left < 0, -1, tree.children_left + offset))
+            rights.append(np.where(tree.children_right < 0, -1, tree.children_right + offset))
+            values.append(value)
+            offset += tree.node_count
+
+        return cls(classes=np.asarray(model.classes_),
+                   roots=np.asarray(roots, dtype=np.int32),
+                   feature=np.concatenate(features).astype(np.int32),
+                   threshold=np.concatenate(thresholds).astype(np.float64),
+                   children_left=np.concatenate(lefts).astype(np.int32),
+                   children_right=np.concatenate(rights).astype(np.int32),
+                   value=np.concatenate(values).astype(value_dtype),
+                   max_depth=max(estimator.tree_.max_depth for estimator in model.estimators_))
+
+    def get_arrays(self) -> Dict[str, np.ndarray]:
+        return {"classes": self.classes, "roots": self.roots, "feature": self.feature, "threshold": self.threshold,
+                "children_left": self.children_left, "children_right": self.children_right, "value": self.value}
+
+    def get_params(self) -> dict:
+        return {"max_depth": self.max_depth}
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], params: dict) -> "NumpyRandomForestClassifier":
+        return cls(max_depth=params["max_depth"], **arrays)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        # sklearn trees compare float32 features against float64 thresholds.
+        X = np.asarray(X, dtype=np.float32)
+        # All trees descend together, one level per step: nodes[row, tree].
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(np.asarray(self.roots, dtype=np.int64), (X.shape[0], len(self.roots)))
+        for _ in range(self.max_depth):
+            left = self.children_left[nodes]
+            internal = left >= 0
+            if not internal.any():
+                break
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(internal, np.where(go_left, left, self.children_right[nodes]), nodes)
+
+        proba = np.zeros((X.shape[0], len(self.classes)))
+        # Trees are accumulated one after the other like sklearn, so the sums match to the last bit.
+        for tree in range(len(self.roots)):
+            proba += self.value[nodes[:, tree]]
+        return proba / len(self.roots)
+
+    @property
+    def classes_(self) -> np.ndarray:
+        return self.classes
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+    def __repr__(self):
+        return "RandomForestClassifier()"
+
+
+class NumpyKNeighborsClassifier:
+    """
+    This class is the array form of a fitted KNeighborsClassifier: the training matrix, the encoded
+    labels, the neighbour settings and the kd-tree index of the fitted model.
+    Training rows are stored in tree order, so every tree node is a contiguous [node_start, node_end)
+    slice of fit_X, bounded by the box [node_lower, node_upper] of its points. The tree is complete:
+    the children of node i are 2i + 1 and 2i + 2, and nodes without children are leaves.
+    Without the node arrays queries fall back to brute force over the training matrix.
+    """
+    model_type = "k_neighbors"
+
+    def __init__(self, classes: np.ndarray, fit_X: np.ndarray, labels: np.ndarray,
+                 n_neighbors: int, weights: str, p: float,
+                 node_start: np.ndarray = None, node_end: np.ndarray = None,
+                 node_lower: np.ndarray = None, node_upper: np.ndarray = None):
+        self.classes = classes
+        self.fit_X = fit_X
+        self.labels = labels
+        self.n_neighbors = int(n_neighbors)
+        self.weights = weights
+        self.p = float(p)
+        self.node_start = node_start
+        self.node_end = node_end
+        self.node_lower = node_lower
+        self.node_upper = node_upper
+
+    @classmethod
+    def from_sklearn(cls, model: KNeighborsClassifier) -> "NumpyKNeighborsClassifier":
+        if model.weights not in ("uniform", "distance"):
+            raise NotImplementedError(f"KNN weights [{model.weights}] are not supported")
+        metric, metric_params = model.effective_metric_, model.effective_metric_params_
+        if metric == "euclidean":
+            p = 2
+        elif metric == "manhattan":
+            p = 1
+        elif metric == "minkowski" and metric_params.get("w") is None:
+            p = metric_params.get("p", model.p)
+        else:
+            raise NotImplementedError(f"KNN metric [{metric}] is not supported")
+        if np.ndim(model._y) != 1:
+            raise NotImplementedError("Multi-output KNN is not supported")
+
+        fit_X = np.asarray(model._fit_X, dtype=np.float64)
+        # The fitted kd-tree; ball tree and brute-force models get a KDTree built for the export,
+        # since ball tree nodes are bounded by spheres rather than boxes.
+        tree = getattr(model, "_tree", None)
+        if not isinstance(tree, KDTree):
+            tree = KDTree(fit_X, leaf_size=model.leaf_size)
+        _, idx_array, node_data, node_bounds = tree.get_arrays()
+        node_data = np.asarray(node_data)
+        node_bounds = np.asarray(node_bounds)
+        order = np.asarray(idx_array)
+
+        labels = np.asarray(model._y)[order]
+        return cls(classes=np.asarray(model.classes_),
+                   fit_X=compact_float_array(fit_X[order]),
+                   labels=labels.astype(np.int8 if len(model.classes_) < 128 else np.int32),
+                   n_neighbors=model.n_neighbors, weights=model.weights, p=p,
+                   node_start=node_data["idx_start"].astype(np.int32),
+                   node_end=node_data["idx_end"].astype(np.int32),
+                   node_lower=compact_float_array(node_bounds[0]),
+                   node_upper=compact_float_array(node_bounds[1]))
+
+    def get_arrays(self) -> Dict[str, np.ndarray]:
+        arrays = {"classes": self.classes, "fit_X": self.fit_X, "labels": self.labels}
+        if self.node_start is not None:
+            arrays.update(node_start=self.node_start, node_end=self.node_end,
+                          node_lower=self.node_lower, node_upper=self.node_upper)
+        return arrays
+
+    def get_params(self) -> dict:
+        return {"n_neighbors": self.n_neighbors, "weights": self.weights, "p": self.p}
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], params: dict) -> "NumpyKNeighborsClassifier":
+        return cls(**arrays, **params)
+
+    def minkowski(self, difference: np.ndarray) -> np.ndarray:
+        """
+        Minkowski norm of coordinate differences over the last axis
+        """
+        if self.p == 2:
+            return np.sqrt(np.einsum("...i,...i->...", difference, difference))
+        difference = np.abs(difference)
+        if self.p == 1:
+            return np.sum(difference, axis=-1)
+        if np.isinf(self.p):
+            return np.max(difference, axis=-1)
+        return np.power(np.sum(np.power(difference, self.p), axis=-1), 1 / self.p)
+
+    def distances(self, X: np.ndarray) -> np.ndarray:
+        return self.minkowski(X[:, None, :] - np.asarray(self.fit_X, dtype=np.float64)[None, :, :])
+
+    @staticmethod
+    def descendants(nodes: np.ndarray, levels: int) -> np.ndarray:
+        # Nodes are stored as a complete binary heap, so descendants on one level are contiguous.
+        return ((nodes[:, None] + 1) << levels) - 1 + np.arange(1 << levels)
+
+    def node_lower_bounds(self, points: np.ndarray, nodes: np.ndarray) -> np.ndarray:
+        """
+        Distance from every point to the box of its node, a lower bound for all rows of the node
+        """
+        lower = np.asarray(self.node_lower[nodes], dtype=np.float64)
+        upper = np.asarray(self.node_upper[nodes], dtype=np.float64)
+        return self.minkowski(points - np.clip(points, lower, upper))
+
+    def leaf_distances(self, points: np.ndarray, leaves: np.ndarray):
+        """
+        Distances from every point to every row of its leaf, inf past the end of a leaf
+        Returns: distances and row indices, both of shape (points, largest of the leaves)
+        """
+        start = np.asarray(self.node_start[leaves], dtype=np.int64)
+        sizes = np.asarray(self.node_end[leaves], dtype=np.int64) - start
+        positions = np.arange(sizes.max() if len(sizes) > 0 else 0)
+        valid = positions[None, :] < sizes[:, None]
+        rows = start[:, None] + np.where(valid, positions[None, :], 0)
+        difference = np.take(self.fit_X, rows, axis=0).astype(np.float64, copy=False)
+        difference -= points[:, None, :]
+        distances = self.minkowski(difference)
+        distances[~valid] = np.inf
+        return distances, rows
+
+    def merge_neighbors(self, best_distances: np.ndarray, best_rows: np.ndarray, queries: np.ndarray,
+                        distances: np.ndarray, rows: np.ndarray) -> None:
+        """
+        Merge one row of candidates per query (distinct queries) into their current n_neighbors best,
+        in place and nearest first
+        """
+        k = self.n_neighbors
+        distances = np.concatenate([best_distances[queries], distances], axis=1)
+        rows = np.concatenate([best_rows[queries], rows], axis=1)
+        nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        nearest_distances = np.take_along_axis(distances, nearest, axis=1)
+        order = np.argsort(nearest_distances, axis=1, kind="stable")
+        best_distances[queries] = np.take_along_axis(nearest_distances, order, axis=1)
+        best_rows[queries] = np.take_along_axis(np.take_along_axis(rows, nearest, axis=1), order, axis=1)
+
+    def kneighbors_indexed(self, X: np.ndarray):
+        """
+        Exact kd-tree query, vectorized over the batch:
+        1. every query descends nearest-first (into the descendant with the closest box) to the node
+           KNN_INDEX_SEED_LEVELS above the leaves, whose contiguous rows give it an initial k-th distance
+        2. all queries then descend the tree again, KNN_INDEX_LEVELS_PER_STEP levels at a time, keeping only
+           the nodes whose box is within their k-th distance, so the cost follows the tree depth instead
+           of the collection size
+        3. the surviving leaves are scanned nearest first, KNN_INDEX_LEAVES_PER_ROUND per query and round
+           (more for small batches), re-pruning with the improved k-th distances between rounds
+        """
+        n_queries, k = X.shape[0], self.n_neighbors
+        best_distances = np.full((n_queries, k), np.inf)
+        best_rows = np.full((n_queries, k), -1, dtype=np.int64)
+        all_queries = np.arange(n_queries)
+        if n_queries == 0:
+            return best_distances, best_rows
+
+        seed = np.zeros(n_queries, dtype=np.int64)
+        leaf_depth = int(np.log2(len(self.node_start) + 1)) - 1
+        seed_depth = max(leaf_depth - KNN_INDEX_SEED_LEVELS, 0)
+        for depth in range(0, seed_depth, KNN_INDEX_LEVELS_PER_STEP):
+            children = self.descendants(seed, min(KNN_INDEX_LEVELS_PER_STEP, seed_depth - depth))
+            bounds = self.node_lower_bounds(X[:, None, :], children)
+            seed = children[all_queries, np.argmin(bounds, axis=1)]
+        self.merge_neighbors(best_distances, best_rows, all_queries, *self.leaf_distances(X, seed))
+
+        queries, nodes, bounds = all_queries, np.zeros(n_queries, dtype=np.int64), np.zeros(n_queries)
+        for depth in range(0, leaf_depth, KNN_INDEX_LEVELS_PER_STEP):
+            levels = min(KNN_INDEX_LEVELS_PER_STEP, leaf_depth - depth)
+            children = self.descendants(nodes, levels).ravel()
+            queries = np.repeat(queries, 1 << levels)
+            bounds = self.node_lower_bounds(X[queries], children)
+            # Bounds never exceed the distance of any row of the node, so farther nodes can be skipped.
+            within = bounds <= best_distances[queries, -1] * (1 + 1e-12)
+            queries, nodes, bounds = queries[within], children[within], bounds[within]
+
+        unscanned = ((nodes + 1) >> (leaf_depth - seed_depth)) - 1 != seed[queries]
+        queries, nodes, bounds = queries[unscanned], nodes[unscanned], bounds[unscanned]
+        if len(queries) == 0:
+            return best_distances, best_rows
+        order = np.lexsort((bounds, queries))
+        queries, nodes, bounds = queries[order], nodes[order], bounds[order]
+        rank = np.arange(len(queries)) - np.searchsorted(queries, queries)
+        width = int((np.asarray(self.node_end) - np.asarray(self.node_start))[nodes].max())
+        # Small batches take more leaves per round, as their rounds cost mostly per-call overhead.
+        per_round = max(KNN_INDEX_LEAVES_PER_ROUND, KNN_INDEX_MIN_LEAVES_PER_ROUND // n_queries)
+        for first_rank in range(0, int(rank.max()) + 1, per_round):
+            in_round = (rank >= first_rank) & (rank < first_rank + per_round)
+            in_round &= bounds <= best_distances[queries, -1] * (1 + 1e-12)
+            if not in_round.any():
+                break
+            round_queries = queries[in_round]
+            distances, rows = self.leaf_distances(X[round_queries], nodes[in_round])
+            # One dense (queries, leaves of the round * largest leaf) candidate matrix for the merge
+            touched, slot = np.unique(round_queries, return_inverse=True)
+            position = rank[in_round] - first_rank
+            candidate_distances = np.full((len(touched), per_round, width), np.inf)
+            candidate_rows = np.zeros((len(touched), per_round, width), dtype=np.int64)
+            candidate_distances[slot, position, :distances.shape[1]] = distances
+            candidate_rows[slot, position, :rows.shape[1]] = rows
+            self.merge_neighbors(best_distances, best_rows, touched,
+                                 candidate_distances.reshape(len(touched), -1),
+                                 candidate_rows.reshape(len(touched), -1))
+        return best_distances, best_rows
+
+    def kneighbors_brute(self, X: np.ndarray):
+        # Bound the (rows, n_train, n_features) difference tensor to about 16M values per chunk.
+        chunk_size = max(1, (1 << 24) // max(1, self.fit_X.shape[0] * self.fit_X.shape[1]))
+        neighbor_distances = np.empty((X.shape[0], self.n_neighbors))
+        neighbor_indices = np.empty((X.shape[0], self.n_neighbors), dtype=np.int64)
+        for start in range(0, X.shape[0], chunk_size):
+            distances = self.distances(X[start:start + chunk_size])
+            candidates = np.argpartition(distances, self.n_neighbors - 1, axis=1)[:, :self.n_neighbors]
+            candidate_distances = np.take_along_axis(distances, candidates, axis=1)
+            order = np.argsort(candidate_distances, axis=1, kind="stable")
+            neighbor_indices[start:start + chunk_size] = np.take_along_axis(candidates, order, axis=1)
+            neighbor_distances[start:start + chunk_size] = np.take_along_axis(candidate_distances, order, axis=1)
+        return neighbor_distances, neighbor_indices
+
+    def kneighbors(self, X: np.ndarray):
+        """
+        Returns: distances and training indices of the n_neighbors nearest rows, nearest first
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if self.node_start is None:
+            return self.kneighbors_brute(X)
+        return self.kneighbors_indexed(X)
+
+    def neighbor_proba(self, neighbor_distances: np.ndarray, neighbor_indices: np.ndarray) -> np.ndarray:
+        """
+        Class probabilities from the neighbours, weighted like sklearn
+        """
+        if self.weights == "distance":
+            with np.errstate(divide="ignore"):
+                weights = 1.0 / neighbor_distances
+            # Rows with an exact match only count the exact matches, like sklearn's _get_weights.
+            exact = np.isinf(weights).any(axis=1)
+            weights[exact] = np.isinf(weights[exact]).astype(np.float64)
+        else:
+            weights = np.ones_like(neighbor_distances)
+
+        neighbor_labels = self.labels[neighbor_indices]
+        proba = np.zeros((neighbor_indices.shape[0], len(self.classes)))
+        for position in range(neighbor_indices.shape[1]):
+            np.add.at(proba, (np.arange(neighbor_indices.shape[0]), neighbor_labels[:, position]),
+                      weights[:, position])
+        normalizer = proba.sum(axis=1, keepdims=True)
+        normalizer[normalizer == 0.0] = 1.0
+        return proba / normalizer
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return self.neighbor_proba(*self.kneighbors(X))
+
+    @property
+    def classes_(self) -> np.ndarray:
+        return self.classes
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+    def __repr__(self):
+        return "KNeighborsClassifier()"
+
+
+NUMPY_MODEL_TYPES = {model_class.model_type: model_class
+                     for model_class in (NumpyRandomForestClassifier, NumpyKNeighborsClassifier)}
+
+
+def to_numpy_model(trained_model_object: object, value_dtype=np.float32):
+    """
+    Returns: the array form of a fitted model listed in config/model.yaml
+    Raises NotImplementedError for any other model
+    """
+    if isinstance(trained_model_object, RandomForestClassifier):
+        return NumpyRandomForestClassifier.from_sklearn(trained_model_object, value_dtype=value_dtype)
+    if isinstance(trained_model_object, KNeighborsClassifier):
+        return NumpyKNeighborsClassifier.from_sklearn(trained_model_object)
+    raise NotImplementedError(f"Model of type {type(trained_model_object).__name__} has no NumPy format")
+
+
+def get_compiled_preprocessor_state(compiled_preprocessor: CompiledPreprocessor):
+    """
+    Split a CompiledPreprocessor into its numeric arrays and its JSON-serializable column/category lists
+    """
+    arrays = {
+        "onehot_offsets": compiled_preprocessor.onehot_offsets,
+        "ordinal_output_index": compiled_preprocessor.ordinal_output_index,
+        "numeric_output_index": compiled_preprocessor.numeric_output_index,
+        "yeo_johnson_lambdas": compiled_preprocessor.yeo_johnson_lambdas,
+        "numeric_mean": compiled_preprocessor.numeric_mean,
+        "numeric_scale": compiled_preprocessor.numeric_scale,
+    }
+    params = {
+        "n_output_features": compiled_preprocessor.n_output_features,
+        "onehot_columns": compiled_preprocessor.onehot_columns,
+        "onehot_categories": [categories.tolist() for categories in compiled_preprocessor.onehot_categories],
+        "ordinal_columns": compiled_preprocessor.ordinal_columns,
+        "ordinal_categories": [categories.tolist() for categories in compiled_preprocessor.ordinal_categories],
+        "numeric_columns": compiled_preprocessor.numeric_columns,
+    }
+    return arrays, params
+
+
+def save_arrays(directory: str, arrays: Dict[str, np.ndarray], prefix: str) -> dict:
+    entries = {}
+    for name, array in arrays.items():
+        file_name = f"{prefix}.{name}.npy"
+        np.save(os.path.join(directory, file_name), np.ascontiguousarray(array), allow_pickle=False)
+        entries[name] = {"file": file_name, "dtype": str(array.dtype), "shape": list(array.shape)}
+    return entries
+
+
+def load_arrays(directory: str, entries: dict, mmap_mode) -> Dict[str, np.ndarray]:
+    return {name: np.load(os.path.join(directory, entry["file"]), mmap_mode=mmap_mode, allow_pickle=False)
+            for name, entry in entries.items()}
+
+
+def save_numpy_model(usvisa_model: USvisaModel, directory: str, verification_array: np.ndarray = None) -> str:
+    """
+    Method Name :   save_numpy_model
+    Description :   This method writes the compiled preprocessor and the trained model of usvisa_model
+                    as .npy files plus a manifest into directory/v<format version>. When verification_array
+                    (transformed features) is given, the exported model must predict exactly like the original,
+                    otherwise float32 node values are widened to float64 before giving up.
+
+    Output      :   Returns the versioned directory
+    On Failure  :   Raises NotImplementedError for models without a NumPy format, ValueError when the
+                    export does not predict like the trained model, USvisaException otherwise
+    """
+    compiled_preprocessor = getattr(usvisa_model, "compiled_preprocessing_object", None)
+    if compiled_preprocessor is None:
+        raise NotImplementedError("The NumPy format needs the compiled preprocessor")
+
+    numpy_model = to_numpy_model(usvisa_model.trained_model_object)
+    if verification_array is not None:
+        expected = usvisa_model.trained_model_object.predict(verification_array)
+        if not np.array_equal(numpy_model.predict(verification_array), expected):
+            logging.info("float32 node values change predictions, exporting them as float64")
+            numpy_model = to_numpy_model(usvisa_model.trained_model_object, value_dtype=np.float64)
+            if not np.array_equal(numpy_model.predict(verification_array), expected):
+                # e.g. KNN neighbours tied at the k-th distance, resolved differently than by the sklearn tree.
+                raise ValueError("NumPy model predictions differ from the trained model")
+
+    try:
+        version_dir = os.path.join(directory, f"v{NUMPY_MODEL_FORMAT_VERSION}")
+        staging_dir = f"{version_dir}.tmp"
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        os.makedirs(staging_dir)
+
+        preprocessor_arrays, preprocessor_params = get_compiled_preprocessor_state(compiled_preprocessor)
+        manifest = {
+            "format_version": NUMPY_MODEL_FORMAT_VERSION,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "model_type": numpy_model.model_type,
+            "decision_threshold": getattr(usvisa_model, "decision_threshold", None),
+            "model_params": numpy_model.get_params(),
+            "model_arrays": save_arrays(staging_dir, numpy_model.get_arrays(), prefix="model"),
+            "preprocessor_params": preprocessor_params,
+            "preprocessor_arrays": save_arrays(staging_dir, preprocessor_arrays, prefix="preprocessor"),
+        }
+        with open(os.path.join(staging_dir, NUMPY_MODEL_MANIFEST_FILE_NAME), "w") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+
+        # Readers never see a half-written version directory.
+        shutil.rmtree(version_dir, ignore_errors=True)
+        os.replace(staging_dir, version_dir)
+        logging.info(f"Saved NumPy {numpy_model.model_type} model to [{version_dir}]")
+        return version_dir
+
+    except Exception as e:
+        raise USvisaException(e, sys) from e
+
+
+def load_numpy_model(directory: str, mmap_mode: str = "r") -> USvisaModel:
+    """
+    Method Name :   load_numpy_model
+    Description :   This method loads a model written by save_numpy_model. With mmap_mode="r" the arrays are
+                    memory-mapped read-only, so worker processes loading the same files share the page cache.
+                    directory may be the versioned directory itself or its parent.
+
+    Output      :   Returns a USvisaModel serving through the compiled preprocessor and the NumPy model
+    On Failure  :   Write an exception log and then raise an exception
+    """
+    try:
+        if not os.path.exists(os.path.join(directory, NUMPY_MODEL_MANIFEST_FILE_NAME)):
+            directory = os.path.join(directory, f"v{NUMPY_MODEL_FORMAT_VERSION}")
+        with open(os.path.join(directory, NUMPY_MODEL_MANIFEST_FILE_NAME)) as manifest_file:
+            manifest = json.load(manifest_file)
+        if manifest["format_version"] != NUMPY_MODEL_FORMAT_VERSION:
+            raise ValueError(f"Unsupported NumPy model format version {manifest['format_version']}")
+
+        model_class = NUMPY_MODEL_TYPES[manifest["model_type"]]
+        numpy_model = model_class.from_arrays(load_arrays(directory, manifest["model_arrays"], mmap_mode),
+                                              manifest["model_params"])
+        compiled_preprocessor = CompiledPreprocessor(
+            **manifest["preprocessor_params"],
+            **load_arrays(directory, manifest["preprocessor_arrays"], mmap_mode),
+        )
+        logging.info(f"Loaded NumPy {manifest['model_type']} model from [{directory}]")
+        return USvisaModel(preprocessing_object=None, trained_model_object=numpy_model,
+                           compiled_preprocessing_object=compiled_preprocessor,
+                           decision_threshold=manifest.get("decision_threshold"))
+
+    except Exception as e:
+        raise USvisaException(e, sys) from e
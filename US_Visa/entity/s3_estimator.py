@@ -62,5 +62,17 @@ class USvisaEstimator:
             if self.loaded_model is None:
                 self.loaded_model = self.load_model()
             return self.loaded_model.predict(dataframe=dataframe)
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+    def predict_proba(self,dataframe:DataFrame):
+        """
+        :param dataframe: raw inputs of a whole batch
+        :return: class probabilities of every row from a single model call
+        """
+        try:
+            if self.loaded_model is None:
+                self.loaded_model = self.load_model()
+            return self.loaded_model.predict_proba(dataframe=dataframe)
         except Exception as e:
             raise USvisaException(e, sys)
\ No newline at end of file
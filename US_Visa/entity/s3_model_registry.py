@@ -0,0 +1,111 @@
+import sys
+from typing import List, Optional
+
+from US_Visa.cloud_storage.aws_storage import SimpleStorageService
+from US_Visa.constant import MODEL_FILE_NAME, MODEL_REGISTRY_LATEST_POINTER, MODEL_REGISTRY_LEGACY_VERSION
+from US_Visa.entity.estimator import USvisaModel
+from US_Visa.exception import USvisaException
+from US_Visa.logger import logging
+
+
+class USvisaS3ModelRegistry:
+    """
+    This class stores every pushed model under its own versioned key,
+    <registry_key_prefix>/<version>/model.pkl, and keeps a LATEST pointer object holding
+    the version serving replicas should use. Before the first versioned push the
+    unversioned model.pkl is served as version "legacy".
+    """
+
+    def __init__(self, bucket_name: str, registry_key_prefix: str):
+        """
+        :param bucket_name: Name of your model bucket
+        :param registry_key_prefix: Key prefix all model versions are stored under
+        """
+        self.bucket_name = bucket_name
+        self.registry_key_prefix = registry_key_prefix
+        self._s3 = None
+
+    @property
+    def s3(self) -> SimpleStorageService:
+        # Created on first use, so serving processes can build the registry before AWS credentials are needed.
+        if self._s3 is None:
+            self._s3 = SimpleStorageService()
+        return self._s3
+
+    def get_model_key(self, version: str) -> str:
+        if version == MODEL_REGISTRY_LEGACY_VERSION:
+            return MODEL_FILE_NAME
+        return f"{self.registry_key_prefix}/{version}/{MODEL_FILE_NAME}"
+
+    def get_latest_pointer_key(self) -> str:
+        return f"{self.registry_key_prefix}/{MODEL_REGISTRY_LATEST_POINTER}"
+
+    def publish_model(self, from_file: str, version: str, remove: bool = False) -> str:
+        """
+        Method Name :   publish_model
+        Description :   This method uploads the model under its versioned key and then moves the LATEST pointer to it
+
+        Output      :   Returns the S3 key of the version
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            model_key = self.get_model_key(version)
+            self.s3.upload_file(from_file, to_filename=model_key, bucket_name=self.bucket_name, remove=remove)
+            self.set_latest_version(version)
+            return model_key
+        except Exception as e:
+            raise USvisaException(e, sys) from e
+
+    def set_latest_version(self, version: str) -> None:
+        """
+        Point LATEST at an already published version, a rollback is the same call with an older version
+        """
+        try:
+            if not self.s3.s3_key_path_available(bucket_name=self.bucket_name, s3_key=self.get_model_key(version)):
+                raise ValueError(f"Model version [{version}] is not in the registry")
+            self.s3.write_text(version, s3_key=self.get_latest_pointer_key(), bucket_name=self.bucket_name)
+            logging.info(f"Model registry LATEST now points to [{version}]")
+        except Exception as e:
+            raise USvisaException(e, sys) from e
+
+    def get_latest_version(self) -> Optional[str]:
+        """
+        Returns: the version LATEST points to, the legacy version if the registry has no pointer yet,
+                 None if there is no model at all
+        """
+        try:
+            pointer_key = self.get_latest_pointer_key()
+            if self.s3.s3_key_path_available(bucket_name=self.bucket_name, s3_key=pointer_key):
+                pointer = self.s3.get_file_object(pointer_key, bucket_name=self.bucket_name)
+                return self.s3.read_object(pointer, decode=True).strip()
+            if self.s3.s3_key_path_available(bucket_name=self.bucket_name, s3_key=MODEL_FILE_NAME):
+                return MODEL_REGISTRY_LEGACY_VERSION
+            return None
+        except Exception as e:
+            raise USvisaException(e, sys) from e
+
+    def list_versions(self) -> List[str]:
+        """
+        Returns: every published version, oldest first
+        """
+        try:
+            bucket = self.s3.get_bucket(self.bucket_name)
+            suffix = f"/{MODEL_FILE_NAME}"
+            versions = [
+                file_object.key[len(self.registry_key_prefix) + 1:-len(suffix)]
+                for file_object in bucket.objects.filter(Prefix=f"{self.registry_key_prefix}/")
+                if file_object.key.endswith(suffix)
+            ]
+            return sorted(versions)
+        except Exception as e:
+            raise USvisaException(e, sys) from e
+
+    def load_model(self, version: str) -> USvisaModel:
+        """
+        Download and unpickle one model version
+        """
+        try:
+            logging.info(f"Loading model version [{version}] from bucket [{self.bucket_name}]")
+            return self.s3.load_model(self.get_model_key(version), bucket_name=self.bucket_name)
+        except Exception as e:
+            raise USvisaException(e, sys) from e
@@ -1,9 +1,15 @@
+import atexit
 import logging
 import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
 
 from from_root import from_root
 from datetime import datetime
 
+from US_Visa.constant import LOG_LEVEL, LOG_MODULE_LEVELS, LOG_ASYNC, LOG_RATE_LIMIT_PER_SECOND
+
 LOG_FILE = f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
 
 log_dir = 'logs'
@@ -12,9 +18,129 @@ logs_path = os.path.join(from_root(), log_dir, LOG_FILE)
 
 os.makedirs(log_dir, exist_ok=True)
 
-logging.basicConfig(
-    filename=logs_path,
-    format="[ %(asctime)s ] %(name)s - %(levelname)s - %(message)s",
-    level=logging.DEBUG,
-)
+LOG_FORMAT = "[ %(asctime)s ] %(name)s - %(levelname)s - %(message)s"
+
+
+class ModuleLevelFilter(logging.Filter):
+    """
+    Every module logs through the root logger, so levels are applied per source file (record.module)
+    """
+
+    def __init__(self, default_level: int, module_levels: dict):
+        super().__init__()
+        self.default_level = default_level
+        self.module_levels = module_levels
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= self.module_levels.get(record.module, self.default_level)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets at most max_per_second records below WARNING through per call site and second.
+    The first record of the next window reports how many were suppressed.
+    """
+
+    def __init__(self, max_per_second: int):
+        super().__init__()
+        self.max_per_second = max_per_second
+        self._windows: dict = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        call_site = (record.pathname, record.lineno)
+        with self._lock:
+            window = self._windows.get(call_site)
+            if window is None or record.created - window[0] >= 1.0:
+                suppressed = 0 if window is None else window[2]
+                self._windows[call_site] = [record.created, 1, 0]
+                if suppressed > 0:
+                    record.msg = f"{record.getMessage()} ({suppressed} similar messages suppressed)"
+                    record.args = None
+                return True
+            if window[1] < self.max_per_second:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+
+def parse_level(level: str) -> int:
+    level_number = logging.getLevelName(level.strip().upper())
+    if not isinstance(level_number, int):
+        raise ValueError(f"Unknown log level: {level}")
+    return level_number
+
+
+def parse_module_levels(module_levels: str) -> dict:
+    """
+    Parse "module=LEVEL,module=LEVEL" into {module: level number}
+    """
+    levels = {}
+    for entry in module_levels.split(","):
+        if "=" in entry:
+            module, level = entry.split("=", 1)
+            levels[module.strip()] = parse_level(level)
+    return levels
+
+
+log_listener = None
+
+
+def configure_logging(use_queue: bool = LOG_ASYNC) -> None:
+    """
+    Install the file handler on the root logger, behind a QueueHandler and a background
+    QueueListener when use_queue is set, so callers only pay for enqueuing the record
+    """
+    global log_listener
+
+    default_level = parse_level(LOG_LEVEL)
+    module_levels = parse_module_levels(LOG_MODULE_LEVELS)
+    filters = [ModuleLevelFilter(default_level=default_level, module_levels=module_levels)]
+    if LOG_RATE_LIMIT_PER_SECOND > 0:
+        filters.append(RateLimitFilter(max_per_second=LOG_RATE_LIMIT_PER_SECOND))
+
+    file_handler = logging.FileHandler(logs_path)
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    if use_queue:
+        log_queue = queue.SimpleQueue()
+        handler = QueueHandler(log_queue)
+        log_listener = QueueListener(log_queue, file_handler)
+        log_listener.start()
+    else:
+        handler = file_handler
+
+    # Filters sit on the first handler, so dropped records are never queued or formatted.
+    for log_filter in filters:
+        handler.addFilter(log_filter)
+
+    root_logger = logging.getLogger()
+    for existing_handler in list(root_logger.handlers):
+        root_logger.removeHandler(existing_handler)
+    root_logger.addHandler(handler)
+    root_logger.setLevel(min([default_level, *module_levels.values()]))
+
+
+def stop_logging() -> None:
+    """
+    Flush the records still queued for the background writer
+    """
+    if log_listener is not None and log_listener._thread is not None:
+        log_listener.stop()
+
+
+def reset_logging_after_fork() -> None:
+    # The writer thread does not survive fork and forked pool workers leave through os._exit
+    # without running atexit, so forked children write synchronously.
+    global log_listener
+    log_listener = None
+    configure_logging(use_queue=False)
+
 
+configure_logging()
+atexit.register(stop_logging)
+if LOG_ASYNC and hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_logging_after_fork)
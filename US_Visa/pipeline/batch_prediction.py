@@ -0,0 +1,129 @@
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+
+import pandas as pd
+from pandas import DataFrame
+from pymongo import UpdateOne
+
+from US_Visa.data_access.usvisa_data import USvisaData
+from US_Visa.entity.config_entity import BatchPredictionConfig
+from US_Visa.entity.estimator import TargetValueMapping
+from US_Visa.entity.numpy_model import load_numpy_model
+from US_Visa.exception import USvisaException
+from US_Visa.logger import logging
+from US_Visa.utils.main_utils import load_object
+from US_Visa.pipeline.prediction_pipeline import USvisaBatchData, USvisaClassifier
+
+
+# Model held by each worker process of the pool, loaded once by init_batch_prediction_worker.
+worker_model = None
+
+
+def init_batch_prediction_worker(model_file_path: str = None) -> None:
+    """
+    Process pool initializer: load one USvisaModel per worker, from a local pickle,
+    a memory-mapped NumPy model directory or from S3
+    """
+    global worker_model
+    if model_file_path is not None and os.path.isdir(model_file_path):
+        worker_model = load_numpy_model(model_file_path, mmap_mode="r")
+    elif model_file_path is not None:
+        worker_model = load_object(file_path=model_file_path)
+    else:
+        worker_model = USvisaClassifier().load_model()
+
+
+def score_batch(dataframe: DataFrame) -> DataFrame:
+    """
+    Score one batch of raw visa cases with the worker's model
+    Returns: DataFrame of case_id and predicted case_status
+    """
+    input_feature_df = USvisaBatchData(records=[]).get_raw_cases_input_data_frame(dataframe)
+    predictions = worker_model.predict(input_feature_df)
+    reverse_mapping = TargetValueMapping().reverse_mapping()
+    return DataFrame({"case_id": dataframe["case_id"].to_numpy(),
+                      "case_status": pd.Series(predictions).astype(int).map(reverse_mapping).to_numpy()})
+
+
+class BatchPrediction:
+    """
+    This class rescores a whole MongoDB collection offline.
+    Batches are read from a single cursor, scored across a process pool whose workers each hold
+    one loaded USvisaModel, and written back as unordered bulk upserts keyed by case_id.
+    """
+
+    def __init__(self, batch_prediction_config: BatchPredictionConfig = BatchPredictionConfig()):
+        """
+        :param batch_prediction_config: Configuration for collections, batch size, pool size and model source
+        """
+        self.batch_prediction_config = batch_prediction_config
+
+    def write_predictions(self, collection, predictions: DataFrame, scored_at: datetime) -> int:
+        """
+        Upsert the predictions of one batch keyed by case_id
+        Returns: number of documents upserted or modified
+        """
+        requests = [
+            UpdateOne({"case_id": case_id},
+                      {"$set": {"case_id": case_id, "case_status_prediction": case_status, "scored_at": scored_at}},
+                      upsert=True)
+            for case_id, case_status in zip(predictions["case_id"], predictions["case_status"])
+        ]
+        if len(requests) == 0:
+            return 0
+        result = collection.bulk_write(requests, ordered=False)
+        return result.upserted_count + result.modified_count
+
+    def run(self) -> dict:
+        """
+        Method Name :   run
+        Description :   Score every document of the input collection and write the predictions back
+
+        Output      :   Returns a summary with rows scored, elapsed seconds and rows/sec
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            config = self.batch_prediction_config
+            usvisa_data = USvisaData()
+            output_collection = usvisa_data.mongo_client.database[config.output_collection_name]
+            # Upserts are keyed by case_id, without an index every upsert scans the collection.
+            output_collection.create_index("case_id", unique=True)
+            scored_at = datetime.utcnow()
+
+            logging.info(f"Batch scoring collection [{config.input_collection_name}] into "
+                         f"[{config.output_collection_name}] with {config.max_workers} workers")
+            start = time.perf_counter()
+            rows = 0
+            max_in_flight = 2 * config.max_workers
+
+            with ProcessPoolExecutor(max_workers=config.max_workers, initializer=init_batch_prediction_worker,
+                                     initargs=(config.model_file_path,)) as executor:
+                in_flight = set()
+                for batch in usvisa_data.iter_collection_batches(collection_name=config.input_collection_name,
+                                                                 batch_size=config.batch_size):
+                    in_flight.add(executor.submit(score_batch, batch))
+                    # Bound the number of batches held in memory while the workers catch up.
+                    if len(in_flight) >= max_in_flight:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            predictions = future.result()
+                            self.write_predictions(output_collection, predictions, scored_at)
+                            rows += len(predictions)
+                            logging.info(f"Scored {rows} rows, {rows / (time.perf_counter() - start):.1f} rows/sec")
+
+                for future in wait(in_flight).done:
+                    predictions = future.result()
+                    self.write_predictions(output_collection, predictions, scored_at)
+                    rows += len(predictions)
+
+            elapsed = time.perf_counter() - start
+            summary = {"rows": rows, "elapsed_seconds": round(elapsed, 3),
+                       "rows_per_second": round(rows / elapsed, 1) if elapsed > 0 else None}
+            logging.info(f"Batch scoring finished: {summary}")
+            return summary
+
+        except Exception as e:
+            raise USvisaException(e, sys) from e
@@ -0,0 +1,132 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+from US_Visa.constant import MODEL_REGISTRY_MAX_RESIDENT_MODELS
+from US_Visa.entity.estimator import USvisaModel
+from US_Visa.exception import USvisaException
+from US_Visa.logger import logging
+
+
+class ModelRegistry:
+    """
+    This class keeps up to max_resident_models model versions loaded in the serving process,
+    evicting the least recently used one, and an active version pointer used by requests that
+    do not pin a version. Activating a resident version, e.g. for a rollback, only swaps the pointer.
+    A version is downloaded at most once at a time: concurrent requests for the same cold version
+    wait for the same load, while the other versions keep serving.
+    """
+
+    def __init__(self, model_loader: Callable[[str], USvisaModel],
+                 latest_version_resolver: Callable[[], Optional[str]],
+                 max_resident_models: int = MODEL_REGISTRY_MAX_RESIDENT_MODELS):
+        """
+        :param model_loader: Loads one model version, e.g. USvisaS3ModelRegistry.load_model
+        :param latest_version_resolver: Returns the version to activate on first use, e.g. the S3 LATEST pointer
+        :param max_resident_models: Number of model versions kept loaded at once
+        """
+        self.model_loader = model_loader
+        self.latest_version_resolver = latest_version_resolver
+        self.max_resident_models = max(1, max_resident_models)
+        self.active_version: Optional[str] = None
+        self.loads = 0
+        self.evictions = 0
+        self._models: OrderedDict = OrderedDict()
+        self._load_locks: dict = {}
+        self._lock = threading.Lock()
+
+    def get_active_version(self) -> str:
+        """
+        Returns: the active version, resolved through latest_version_resolver on first use
+        """
+        if self.active_version is None:
+            version = self.latest_version_resolver()
+            if version is None:
+                raise ValueError("No model version is available in the registry")
+            with self._lock:
+                if self.active_version is None:
+                    self.active_version = version
+                    logging.info(f"Active model version resolved to [{version}]")
+        return self.active_version
+
+    def _put(self, version: str, model: USvisaModel) -> None:
+        # Caller holds self._lock.
+        self._models[version] = model
+        self._models.move_to_end(version)
+        while len(self._models) > self.max_resident_models:
+            evicted = next((resident for resident in self._models if resident != self.active_version), None)
+            if evicted is None:
+                break
+            del self._models[evicted]
+            self.evictions += 1
+            logging.info(f"Evicted model version [{evicted}] from the resident models")
+
+    def put(self, version: str, model: USvisaModel, activate: bool = False) -> None:
+        """
+        Make an already loaded model resident under version, optionally activating it
+        """
+        with self._lock:
+            if activate:
+                self.active_version = version
+            self._put(version, model)
+
+    def get_model(self, version: str = None) -> Tuple[str, USvisaModel]:
+        """
+        Method Name :   get_model
+        Description :   This method returns the resident model of version (the active one when None),
+                        loading it first if it is not resident
+
+        Output      :   Returns the version served and its model
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            if version is None:
+                version = self.get_active_version()
+
+            with self._lock:
+                model = self._models.get(version)
+                if model is not None:
+                    self._models.move_to_end(version)
+                    return version, model
+                load_lock = self._load_locks.setdefault(version, threading.Lock())
+
+            with load_lock:
+                try:
+                    with self._lock:
+                        model = self._models.get(version)
+                    if model is None:
+                        model = self.model_loader(version)
+                        with self._lock:
+                            self.loads += 1
+                            self._put(version, model)
+                finally:
+                    # Also after a failed load, so unknown versions do not accumulate locks.
+                    with self._lock:
+                        if self._load_locks.get(version) is load_lock:
+                            del self._load_locks[version]
+            return version, model
+
+        except Exception as e:
+            raise USvisaException(e, sys) from e
+
+    def activate(self, version: str) -> None:
+        """
+        Load version if needed, off the request path, then make it the active version
+        """
+        _, model = self.get_model(version)
+        with self._lock:
+            previous_version, self.active_version = self.active_version, version
+            # The version may have been evicted since get_model returned; making it resident again
+            # in the same critical section keeps the active version always resident.
+            self._put(version, model)
+        logging.info(f"Active model version switched from [{previous_version}] to [{version}]")
+
+    def stats(self) -> dict:
+        """
+        Returns: active version, resident versions from least to most recently used and load/eviction counters
+        """
+        with self._lock:
+            return {"active_version": self.active_version, "resident_versions": list(self._models),
+                    "max_resident_models": self.max_resident_models,
+                    "loads": self.loads, "evictions": self.evictions}
@@ -0,0 +1,139 @@
+import asyncio
+import sys
+from concurrent.futures import Executor
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from US_Visa.entity.config_entity import PredictionBatcherConfig
+from US_Visa.exception import USvisaException
+from US_Visa.logger import logging
+from US_Visa.pipeline.prediction_pipeline import USvisaClassifier
+from US_Visa.pipeline.shadow_scorer import ShadowScorer
+
+
+class PredictionBatcher:
+    """
+    This class coalesces concurrent prediction requests into a single batched call.
+    Requests are queued and flushed as one preprocessing transform + model predict
+    either when the batch reaches max_batch_size or max_wait_ms after its first request,
+    and every awaiting request gets back the predictions of its own rows.
+    Batches are scored on the given executor so the event loop is never blocked by inference.
+    """
+
+    def __init__(self, model_predictor: USvisaClassifier = None,
+                 batcher_config: PredictionBatcherConfig = PredictionBatcherConfig(),
+                 executor: Executor = None, shadow_scorer: ShadowScorer = None):
+        """
+        :param model_predictor: Classifier used to score the coalesced batches
+        :param batcher_config: Configuration for batch size and wait window
+        :param executor: Executor running the blocking predict calls, the loop default executor if None
+        :param shadow_scorer: Optional ShadowScorer every answered batch is handed to
+        """
+        self.model_predictor = model_predictor if model_predictor is not None else USvisaClassifier()
+        self.batcher_config = batcher_config
+        self.executor = executor
+        self.shadow_scorer = shadow_scorer
+        self._queue: asyncio.Queue = None
+        self._worker: asyncio.Task = None
+        self._flushes: set = set()
+
+    async def predict(self, dataframe: DataFrame):
+        """
+        Queue the rows of dataframe for the next batch and wait for their predictions
+        """
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+        future = loop.create_future()
+        await self._queue.put((dataframe, future))
+        return await future
+
+    async def _collect_batch(self) -> list:
+        """
+        Wait for the first request, then gather more until the batch is full or the wait window closes
+        """
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        batch_rows = len(batch[0][0])
+        deadline = loop.time() + self.batcher_config.max_wait_ms / 1000
+
+        while batch_rows < self.batcher_config.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            batch_rows += len(item[0])
+        return batch
+
+    async def _flush(self, batch: list) -> None:
+        """
+        Score all queued rows with one predict call and resolve every waiting future with its slice.
+        When the batched call fails, every request is scored on its own, so only the requests that
+        cannot be scored (e.g. an unknown category) get the error
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            dataframe = pd.concat([frame for frame, _ in batch], ignore_index=True)
+            logging.info(f"Flushing prediction batch of {len(batch)} requests and {len(dataframe)} rows")
+            predictions = await loop.run_in_executor(self.executor, self.model_predictor.predict, dataframe)
+        except Exception as e:
+            if len(batch) == 1:
+                self._set_exception(batch[0][1], e)
+                return
+            logging.warning(f"Prediction batch of {len(batch)} requests failed, scoring them one by one: {e}")
+            batch, dataframe, predictions = await self._flush_one_by_one(batch)
+            if len(batch) == 0:
+                return
+
+        offset = 0
+        for frame, future in batch:
+            if not future.done():
+                future.set_result(predictions[offset:offset + len(frame)])
+            offset += len(frame)
+
+        # After the futures are resolved, the candidate never delays production responses.
+        # predict gives no scores, the shadow task computes the production ones itself.
+        if self.shadow_scorer is not None:
+            self.shadow_scorer.submit(dataframe, predictions)
+
+    async def _flush_one_by_one(self, batch: list):
+        """
+        Score every request of a failed batch separately, failing only the futures of the requests that raise
+        Returns: the scored requests, their concatenated rows and predictions
+        """
+        loop = asyncio.get_running_loop()
+        scored, scored_predictions = [], []
+        for frame, future in batch:
+            try:
+                predictions = await loop.run_in_executor(self.executor, self.model_predictor.predict, frame)
+            except Exception as e:
+                self._set_exception(future, e)
+                continue
+            scored.append((frame, future))
+            scored_predictions.append(np.asarray(predictions))
+        if len(scored) == 0:
+            return scored, None, None
+        dataframe = pd.concat([frame for frame, _ in scored], ignore_index=True)
+        return scored, dataframe, np.concatenate(scored_predictions)
+
+    @staticmethod
+    def _set_exception(future: asyncio.Future, error: Exception) -> None:
+        if not future.done():
+            future.set_exception(USvisaException(error, sys))
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch()
+            # Keep collecting the next batch while this one is scored on the executor.
+            flush = loop.create_task(self._flush(batch))
+            self._flushes.add(flush)
+            flush.add_done_callback(self._flushes.discard)
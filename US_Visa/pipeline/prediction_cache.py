@@ -0,0 +1,106 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import List
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from US_Visa.entity.config_entity import PredictionCacheConfig
+from US_Visa.exception import USvisaException
+from US_Visa.logger import logging
+from US_Visa.utils.metrics import latency_metrics
+
+
+class PredictionCache:
+    """
+    This class is a bounded LRU cache in front of USvisaModel.predict.
+    Rows are keyed on their canonicalized feature tuple, so repeated employer profiles
+    skip preprocessing and model evaluation. The cache is emptied whenever it is used
+    with a different model object than the one its entries were computed with.
+    """
+
+    def __init__(self, feature_columns: List[str], numeric_columns: List[str],
+                 prediction_cache_config: PredictionCacheConfig = PredictionCacheConfig()):
+        """
+        :param feature_columns: Model input columns making up the cache key, in key order
+        :param numeric_columns: Columns among feature_columns that are keyed as numbers
+        :param prediction_cache_config: Configuration for cache size and numeric binning
+        """
+        self.feature_columns = list(feature_columns)
+        self.numeric_columns = set(numeric_columns)
+        self.prediction_cache_config = prediction_cache_config
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._model = None
+        self._lock = threading.Lock()
+
+    def make_keys(self, dataframe: DataFrame) -> list:
+        """
+        Build the canonical key of every row: stripped strings for categories and
+        floats (or bin numbers when numeric_bin_width is set) for numerics
+        """
+        key_columns = []
+        bin_width = self.prediction_cache_config.numeric_bin_width
+        for column in self.feature_columns:
+            if column in self.numeric_columns:
+                values = pd.to_numeric(dataframe[column]).to_numpy(dtype=np.float64)
+                if bin_width > 0:
+                    values = np.floor(values / bin_width)
+                key_columns.append(values.tolist())
+            else:
+                key_columns.append(dataframe[column].astype(str).str.strip().tolist())
+        return list(zip(*key_columns))
+
+    def predict(self, model, dataframe: DataFrame) -> np.ndarray:
+        """
+        Serve cached rows from the cache and score the remaining rows with one model.predict call
+        Returns: predictions for every row of dataframe
+        """
+        try:
+            with latency_metrics.timer("cache_lookup"):
+                keys = self.make_keys(dataframe)
+                results = [None] * len(keys)
+                miss_positions = []
+
+                with self._lock:
+                    if model is not self._model:
+                        if self._model is not None:
+                            logging.info("Loaded model changed, clearing the prediction cache")
+                        self._entries.clear()
+                        self._model = model
+                    for position, key in enumerate(keys):
+                        value = self._entries.get(key)
+                        if value is None:
+                            miss_positions.append(position)
+                        else:
+                            self._entries.move_to_end(key)
+                            results[position] = value
+                    self.hits += len(keys) - len(miss_positions)
+                    self.misses += len(miss_positions)
+
+            if len(miss_positions) > 0:
+                predictions = model.predict(dataframe.iloc[miss_positions])
+                with self._lock:
+                    for position, value in zip(miss_positions, predictions):
+                        results[position] = value
+                        if model is self._model:
+                            self._entries[keys[position]] = value
+                            self._entries.move_to_end(keys[position])
+                    while len(self._entries) > self.prediction_cache_config.max_size:
+                        self._entries.popitem(last=False)
+
+            return np.asarray(results)
+
+        except Exception as e:
+            raise USvisaException(e, sys) from e
+
+    def stats(self) -> dict:
+        """
+        Returns: hit/miss counters and current size of the cache
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries),
+                    "max_size": self.prediction_cache_config.max_size}
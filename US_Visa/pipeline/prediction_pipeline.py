@@ -1,13 +1,23 @@
 import os
 import sys
+import threading
+import time
+from typing import IO, Iterator, List
 
 import numpy as np
 import pandas as pd
-from US_Visa.entity.config_entity import USvisaPredictorConfig
-from US_Visa.entity.s3_estimator import USvisaEstimator
+from US_Visa.entity.config_entity import USvisaPredictorConfig, PredictionCacheConfig
+from US_Visa.entity.s3_model_registry import USvisaS3ModelRegistry
+from US_Visa.entity.estimator import USvisaModel, TargetValueMapping
+from US_Visa.entity.numpy_model import load_numpy_model
+from US_Visa.constant import SCHEMA_FILE_PATH, TARGET_COLUMN, CURRENT_YEAR, PREDICTION_CSV_CHUNK_SIZE, \
+    PREDICTION_WARMUP_RECORD
 from US_Visa.exception import USvisaException
 from US_Visa.logger import logging
+from US_Visa.utils.metrics import latency_metrics
 from US_Visa.utils.main_utils import read_yaml_file
+from US_Visa.pipeline.prediction_cache import PredictionCache
+from US_Visa.pipeline.model_registry import ModelRegistry
 from pandas import DataFrame
 
 
@@ -86,7 +96,88 @@ class USvisaData:
         except Exception as e:
             raise USvisaException(e, sys) from e
 
+class USvisaBatchData:
+    # Schema is read once per process, the feature list does not change between requests.
+    schema_config: dict = None
+
+    def __init__(self, records: List[dict]):
+        """
+        Usvisa batch data constructor
+        Input: list of records, each holding all features of the trained model for prediction
+        """
+        try:
+            self.records = records
+            if USvisaBatchData.schema_config is None:
+                USvisaBatchData.schema_config = read_yaml_file(file_path=SCHEMA_FILE_PATH)
+        except Exception as e:
+            raise USvisaException(e, sys) from e
+
+    def get_feature_columns(self) -> List[str]:
+        """
+        This function returns the model input columns listed in config/schema.yaml
+        """
+        feature_columns = []
+        for key in ("oh_columns", "or_columns", "num_features"):
+            for column in USvisaBatchData.schema_config[key]:
+                if column not in feature_columns:
+                    feature_columns.append(column)
+        return feature_columns
+
+    def get_usvisa_input_data_frame(self) -> DataFrame:
+        """
+        This function validates the records against the schema features
+        and returns them as a single DataFrame
+        """
+        try:
+            if not isinstance(self.records, list) or len(self.records) == 0:
+                raise ValueError("Expected a non-empty list of records")
+
+            feature_columns = self.get_feature_columns()
+            for index, record in enumerate(self.records):
+                if not isinstance(record, dict):
+                    raise ValueError(f"Record {index} is not an object")
+                missing_columns = [column for column in feature_columns if record.get(column) is None]
+                if len(missing_columns) > 0:
+                    raise ValueError(f"Record {index} is missing features: {missing_columns}")
+
+            dataframe = DataFrame.from_records(self.records, columns=feature_columns)
+            for column in USvisaBatchData.schema_config["num_features"]:
+                dataframe[column] = pd.to_numeric(dataframe[column])
+
+            logging.info(f"Created usvisa batch dataframe with shape {dataframe.shape}")
+            return dataframe
+
+        except Exception as e:
+            raise USvisaException(e, sys) from e
+
+    def get_raw_cases_input_data_frame(self, dataframe: DataFrame) -> DataFrame:
+        """
+        This function takes raw visa cases in the Visadataset.csv / MongoDB layout, derives
+        company_age like DataTransformation does and returns only the model input columns
+        """
+        try:
+            required_columns = ["case_id", "yr_of_estab"] + [
+                column for column in self.get_feature_columns() if column != "company_age"]
+            missing_columns = [column for column in required_columns if column not in dataframe.columns]
+            if len(missing_columns) > 0:
+                raise ValueError(f"Raw cases are missing columns: {missing_columns}")
+
+            input_feature_df = dataframe[[column for column in self.get_feature_columns() if column != "company_age"]].copy()
+            input_feature_df['company_age'] = CURRENT_YEAR-dataframe['yr_of_estab']
+            return input_feature_df[self.get_feature_columns()]
+
+        except Exception as e:
+            raise USvisaException(e, sys) from e
+
+
 class USvisaClassifier:
+    # Model versions loaded from S3 are shared by every instance and worker thread of the process,
+    # so the download and unpickling of a version happen only once.
+    model_registry: ModelRegistry = None
+    model_load_lock = threading.Lock()
+    # Process-wide LRU cache of predictions, built on first use from the schema features.
+    prediction_cache: PredictionCache = None
+
     def __init__(self,prediction_pipeline_config: USvisaPredictorConfig = USvisaPredictorConfig(),) -> None:
         """
         :param prediction_pipeline_config: Configuration for prediction the value
@@ -94,24 +185,171 @@ class USvisaClassifier:
         try:
             # self.schema_config = read_yaml_file(SCHEMA_FILE_PATH)
             self.prediction_pipeline_config = prediction_pipeline_config
+            # Version served by the last load_model call of this instance.
+            self.model_version = None
         except Exception as e:
             raise USvisaException(e, sys)
 
 
-    def predict(self, dataframe) -> str:
+    @classmethod
+    def get_model_registry(cls, prediction_pipeline_config: USvisaPredictorConfig = USvisaPredictorConfig()) -> ModelRegistry:
+        """
+        This is the method of USvisaClassifier
+        Returns: The process-wide ModelRegistry, serving the S3 model registry versions,
+                 or only the local NumPy model when numpy_model_dir is set
+        """
+        if cls.model_registry is None:
+            with cls.model_load_lock:
+                if cls.model_registry is None:
+                    numpy_model_dir = prediction_pipeline_config.numpy_model_dir
+                    if numpy_model_dir:
+                        def load_local_model(version: str) -> USvisaModel:
+                            if version != numpy_model_dir:
+                                raise ValueError(f"Only the local model [{numpy_model_dir}] is served")
+                            # Memory-mapped, so every worker process on the host shares one page-cached copy.
+                            return load_numpy_model(numpy_model_dir, mmap_mode="r")
+                        model_loader, latest_version_resolver = load_local_model, lambda: numpy_model_dir
+                    else:
+                        s3_model_registry = USvisaS3ModelRegistry(
+                            bucket_name=prediction_pipeline_config.model_bucket_name,
+                            registry_key_prefix=prediction_pipeline_config.registry_key_prefix,
+                        )
+                        model_loader = s3_model_registry.load_model
+                        latest_version_resolver = s3_model_registry.get_latest_version
+                    cls.model_registry = ModelRegistry(model_loader=model_loader,
+                                                       latest_version_resolver=latest_version_resolver,
+                                                       max_resident_models=prediction_pipeline_config.max_resident_models)
+        return cls.model_registry
+
+
+    def load_model(self, model_version: str = None) -> USvisaModel:
+        """
+        This is the method of USvisaClassifier
+        Returns: The resident USvisaModel of model_version, the active version when None,
+                 loading it from S3 on first use. Concurrent cold calls share a single download.
+        """
+        try:
+            self.model_version, model = USvisaClassifier.get_model_registry(
+                self.prediction_pipeline_config).get_model(model_version)
+            return model
+
+        except Exception as e:
+            raise USvisaException(e, sys) from e
+
+
+    def warm_up(self) -> float:
         """
         This is the method of USvisaClassifier
+        Loads the production model and runs one dummy prediction through the full USvisaModel.predict
+        path, bypassing the prediction cache, so the first real request pays no cold-start cost
+        Returns: Seconds spent warming up
+        """
+        try:
+            start = time.perf_counter()
+            model = self.load_model()
+            usvisa_batch_data = USvisaBatchData(records=[PREDICTION_WARMUP_RECORD])
+            model.predict(usvisa_batch_data.get_usvisa_input_data_frame())
+            elapsed = time.perf_counter() - start
+            logging.info(f"Model warm-up finished in {elapsed:.3f}s")
+            return elapsed
+
+        except Exception as e:
+            raise USvisaException(e, sys) from e
+
+
+    @classmethod
+    def get_prediction_cache(cls, prediction_cache_config: PredictionCacheConfig = PredictionCacheConfig()):
+        """
+        This is the method of USvisaClassifier
+        Returns: The process-wide PredictionCache, None when it is disabled
+        """
+        if prediction_cache_config.max_size <= 0:
+            return None
+        if cls.prediction_cache is None:
+            with cls.model_load_lock:
+                if cls.prediction_cache is None:
+                    usvisa_batch_data = USvisaBatchData(records=[])
+                    cls.prediction_cache = PredictionCache(
+                        feature_columns=usvisa_batch_data.get_feature_columns(),
+                        numeric_columns=USvisaBatchData.schema_config["num_features"],
+                        prediction_cache_config=prediction_cache_config,
+                    )
+        return cls.prediction_cache
+
+
+    def predict(self, dataframe, model_version: str = None, use_cache: bool = True) -> str:
+        """
+        This is the method of USvisaClassifier
+        :param use_cache: Whether the process-wide prediction cache may serve and store the rows
         Returns: Prediction in string format
         """
         try:
             logging.info("Entered predict method of USvisaClassifier class")
-            model = USvisaEstimator(
-                bucket_name=self.prediction_pipeline_config.model_bucket_name,
-                model_path=self.prediction_pipeline_config.model_file_path,
-            )
+            with latency_metrics.timer("model_load"):
+                model = self.load_model(model_version)
+            # Only the active version is cached, pinned versions would keep evicting its entries.
+            prediction_cache = USvisaClassifier.get_prediction_cache() if model_version is None and use_cache else None
+            if prediction_cache is not None:
+                return prediction_cache.predict(model, dataframe)
             result =  model.predict(dataframe)
             
             return result
         
         except Exception as e:
-            raise USvisaException(e, sys) from e
\ No newline at end of file
+            raise USvisaException(e, sys) from e
+
+
+    def predict_status(self, dataframe: DataFrame, model_version: str = None, use_cache: bool = True) -> List[str]:
+        """
+        This is the method of USvisaClassifier
+        Returns: Predictions for every row of the dataframe mapped back to case_status labels
+        """
+        try:
+            predictions = self.predict(dataframe, model_version=model_version, use_cache=use_cache)
+            reverse_mapping = TargetValueMapping().reverse_mapping()
+            return pd.Series(predictions).astype(int).map(reverse_mapping).tolist()
+
+        except Exception as e:
+            raise USvisaException(e, sys) from e
+
+
+    def predict_status_with_scores(self, dataframe: DataFrame, model_version: str = None):
+        """
+        This is the method of USvisaClassifier
+        Scores the whole batch with a single predict_proba call, labels are derived from the same
+        probabilities with the model's decision threshold
+        Returns: case_status labels and class 1 scores for every row of the dataframe
+        """
+        try:
+            model = self.load_model(model_version)
+            probabilities = model.predict_proba(dataframe)
+            reverse_mapping = TargetValueMapping().reverse_mapping()
+            statuses = pd.Series(model.labels_from_proba(probabilities)).astype(int).map(reverse_mapping).tolist()
+            return statuses, model.scores_from_proba(probabilities).tolist()
+
+        except Exception as e:
+            raise USvisaException(e, sys) from e
+
+
+    def predict_csv(self, csv_file: IO, chunk_size: int = PREDICTION_CSV_CHUNK_SIZE,
+                    model_version: str = None) -> Iterator[str]:
+        """
+        This is the method of USvisaClassifier
+        Reads raw visa cases in the Visadataset.csv format (without case_status) chunk by chunk,
+        derives company_age like DataTransformation does and scores every chunk
+        Returns: Iterator over CSV text blocks of case_id,case_status, the first one with the header
+        """
+        try:
+            usvisa_batch_data = USvisaBatchData(records=[])
+            first_chunk = True
+            for chunk in pd.read_csv(csv_file, chunksize=chunk_size, na_values="na"):
+                input_feature_df = usvisa_batch_data.get_raw_cases_input_data_frame(chunk)
+
+                # Bulk files would flush the LRU cache kept for the interactive traffic, and rarely repeat rows.
+                predictions = self.predict_status(input_feature_df, model_version=model_version, use_cache=False)
+
+                yield DataFrame({"case_id": chunk["case_id"], TARGET_COLUMN: predictions}).to_csv(index=False, header=first_chunk)
+                first_chunk = False
+
+        except Exception as e:
+            raise USvisaException(e, sys) from e
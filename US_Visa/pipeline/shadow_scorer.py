@@ -0,0 +1,193 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+from pandas import DataFrame
+
+from US_Visa.entity.config_entity import ShadowScoringConfig
+from US_Visa.logger import logging
+from US_Visa.pipeline.model_registry import ModelRegistry
+
+
+class ShadowAggregate:
+    """
+    Running agreement and score delta totals between the candidate and the production model
+    """
+
+    def __init__(self):
+        self.batches = 0
+        self.rows = 0
+        self.agreements = 0
+        self.scored_rows = 0
+        self.score_delta_sum = 0.0
+        self.score_abs_delta_sum = 0.0
+        self.score_abs_delta_max = 0.0
+        self.errors = 0
+        self.dropped_batches = 0
+        self.started_at = time.time()
+
+    def add(self, production_labels: np.ndarray, candidate_labels: np.ndarray,
+            production_scores: Optional[np.ndarray], candidate_scores: np.ndarray) -> None:
+        self.batches += 1
+        self.rows += len(production_labels)
+        self.agreements += int(np.sum(production_labels == candidate_labels))
+        if production_scores is not None:
+            deltas = candidate_scores - production_scores
+            self.scored_rows += len(deltas)
+            self.score_delta_sum += float(np.sum(deltas))
+            self.score_abs_delta_sum += float(np.sum(np.abs(deltas)))
+            self.score_abs_delta_max = max(self.score_abs_delta_max, float(np.max(np.abs(deltas), initial=0.0)))
+
+    def to_dict(self) -> dict:
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "agreement_rate": None if self.rows == 0 else self.agreements / self.rows,
+            "scored_rows": self.scored_rows,
+            "mean_score_delta": None if self.scored_rows == 0 else self.score_delta_sum / self.scored_rows,
+            "mean_abs_score_delta": None if self.scored_rows == 0 else self.score_abs_delta_sum / self.scored_rows,
+            "max_abs_score_delta": self.score_abs_delta_max,
+            "errors": self.errors,
+            "dropped_batches": self.dropped_batches,
+            "window_seconds": round(time.time() - self.started_at, 3),
+        }
+
+
+class ShadowScorer:
+    """
+    This class scores the batches production has already answered with a candidate model version
+    from the registry, on its own background executor. submit never waits for the candidate:
+    when max_pending_batches are already queued the batch is dropped and counted instead.
+    Batches submitted without production scores get them from the active production model in the
+    same background task. Agreement rate and score deltas are aggregated in memory and flushed to
+    the log every flush_interval_seconds by a timer thread, lifetime totals are kept alongside.
+    """
+
+    def __init__(self, model_registry: ModelRegistry,
+                 shadow_scoring_config: ShadowScoringConfig = ShadowScoringConfig()):
+        """
+        :param model_registry: Registry the candidate version is loaded from
+        :param shadow_scoring_config: Configuration for candidate version, backlog and flush interval
+        """
+        self.model_registry = model_registry
+        self.shadow_scoring_config = shadow_scoring_config
+        self.candidate_version = shadow_scoring_config.candidate_version
+        self.window = ShadowAggregate()
+        self.total = ShadowAggregate()
+        self.last_flush: Optional[dict] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor = None
+        self._flusher: threading.Thread = None
+        self._stopped = threading.Event()
+
+    @property
+    def enabled(self) -> bool:
+        return self.candidate_version is not None
+
+    def set_candidate(self, candidate_version: Optional[str]) -> None:
+        """
+        Switch the shadowed version, None disables shadow scoring. The aggregates restart.
+        """
+        with self._lock:
+            self.candidate_version = candidate_version
+            self.window = ShadowAggregate()
+            self.total = ShadowAggregate()
+            self.last_flush = None
+        logging.info(f"Shadow scoring candidate set to [{candidate_version}]")
+
+    def submit(self, dataframe: DataFrame, production_labels, production_scores=None) -> bool:
+        """
+        Queue the batch for candidate scoring without waiting for it. Without production_scores,
+        the production model scores the batch again in the background task, never on the response path
+        Returns: whether the batch was queued
+        """
+        if not self.enabled:
+            return False
+        with self._lock:
+            if self._pending >= self.shadow_scoring_config.max_pending_batches:
+                self.window.dropped_batches += 1
+                self.total.dropped_batches += 1
+                return False
+            self._pending += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.shadow_scoring_config.max_workers,
+                                                    thread_name_prefix="usvisa-shadow")
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run_flusher, name="usvisa-shadow-flush", daemon=True)
+                self._flusher.start()
+        self._executor.submit(self._score, self.candidate_version, dataframe,
+                              np.asarray(production_labels),
+                              None if production_scores is None else np.asarray(production_scores, dtype=np.float64))
+        return True
+
+    def _score(self, candidate_version: str, dataframe: DataFrame, production_labels: np.ndarray,
+               production_scores: Optional[np.ndarray]) -> None:
+        try:
+            if production_scores is None:
+                _, production_model = self.model_registry.get_model()
+                production_scores = production_model.scores_from_proba(production_model.predict_proba(dataframe))
+            _, model = self.model_registry.get_model(candidate_version)
+            probabilities = model.predict_proba(dataframe)
+            candidate_labels = model.labels_from_proba(probabilities)
+            candidate_scores = model.scores_from_proba(probabilities)
+            with self._lock:
+                if candidate_version == self.candidate_version:
+                    for aggregate in (self.window, self.total):
+                        aggregate.add(production_labels, candidate_labels, production_scores, candidate_scores)
+        except Exception as e:
+            logging.warning(f"Shadow scoring with version [{candidate_version}] failed: {e}")
+            with self._lock:
+                self.window.errors += 1
+                self.total.errors += 1
+        finally:
+            with self._lock:
+                self._pending -= 1
+        self.flush(force=False)
+
+    def _run_flusher(self) -> None:
+        """
+        Flush the window once it is flush_interval_seconds old, also when no batch arrives to trigger it
+        """
+        interval = self.shadow_scoring_config.flush_interval_seconds
+        while True:
+            with self._lock:
+                remaining = interval - (time.time() - self.window.started_at)
+            # An empty window is not flushed and keeps its age, so wait a full interval for it.
+            if self._stopped.wait(remaining if remaining > 0 else interval):
+                return
+            self.flush(force=False)
+
+    def flush(self, force: bool = True) -> Optional[dict]:
+        """
+        Log the aggregates of the current window and start a new one, unless the window is
+        younger than flush_interval_seconds and force is False
+        Returns: the flushed window, None if nothing was flushed
+        """
+        with self._lock:
+            window = self.window
+            if not force and time.time() - window.started_at < self.shadow_scoring_config.flush_interval_seconds:
+                return None
+            if window.batches == 0 and window.errors == 0 and window.dropped_batches == 0:
+                return None
+            self.window = ShadowAggregate()
+            self.last_flush = {"candidate_version": self.candidate_version, "flushed_at": time.time(),
+                               **window.to_dict()}
+        logging.info(f"Shadow scoring window: {self.last_flush}")
+        return self.last_flush
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"enabled": self.enabled, "candidate_version": self.candidate_version,
+                    "pending_batches": self._pending, "window": self.window.to_dict(),
+                    "total": self.total.to_dict(), "last_flush": self.last_flush}
+
+    def shutdown(self) -> None:
+        self._stopped.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        self.flush(force=True)
@@ -0,0 +1,153 @@
+import multiprocessing
+import queue
+import sys
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field, asdict
+from typing import Optional, Tuple
+
+from US_Visa.exception import USvisaException
+from US_Visa.logger import logging
+
+
+JOB_STATUS_QUEUED = "queued"
+JOB_STATUS_RUNNING = "running"
+JOB_STATUS_SUCCEEDED = "succeeded"
+JOB_STATUS_FAILED = "failed"
+
+
+@dataclass
+class TrainingJob:
+    job_id: str
+    status: str = JOB_STATUS_QUEUED
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    current_stage: Optional[str] = None
+    stages: dict = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        job = asdict(self)
+        end = self.finished_at if self.finished_at is not None else time.time()
+        job["duration_seconds"] = None if self.started_at is None else round(end - self.started_at, 3)
+        return job
+
+
+def run_training_job(progress_queue) -> None:
+    """
+    Entry point of the training worker process.
+    Runs the complete TrainPipeline and reports every stage event back through progress_queue.
+    """
+    try:
+        # Imported here so the serving process never loads the training stack itself.
+        from US_Visa.pipeline.training_pipeline import TrainPipeline
+
+        train_pipeline = TrainPipeline(
+            progress_callback=lambda stage, event: progress_queue.put(("stage", stage, event, time.time()))
+        )
+        train_pipeline.run_pipeline()
+        progress_queue.put((JOB_STATUS_SUCCEEDED, None, None, time.time()))
+    except Exception as e:
+        progress_queue.put((JOB_STATUS_FAILED, None, f"{e}", time.time()))
+
+
+class TrainingJobManager:
+    """
+    This class runs TrainPipeline in a separate worker process and tracks its progress.
+    Only one training job runs at a time: submitting while a job is queued or running
+    returns that job instead of starting a second full training run.
+    """
+
+    def __init__(self):
+        self._jobs: dict = {}
+        self._active_job: Optional[TrainingJob] = None
+        self._lock = threading.Lock()
+        # spawn gives every run a fresh interpreter, so config timestamps and artifact dirs are new per job.
+        self._context = multiprocessing.get_context("spawn")
+
+    def submit(self) -> Tuple[TrainingJob, bool]:
+        """
+        Start a training job unless one is already in flight
+        Returns: the job and whether it was newly created
+        """
+        try:
+            with self._lock:
+                if self._active_job is not None and self._active_job.status in (JOB_STATUS_QUEUED, JOB_STATUS_RUNNING):
+                    logging.info(f"Training job [{self._active_job.job_id}] already in flight, not starting another")
+                    return self._active_job, False
+
+                job = TrainingJob(job_id=uuid.uuid4().hex)
+                self._jobs[job.job_id] = job
+                self._active_job = job
+
+            progress_queue = self._context.Queue()
+            process = self._context.Process(target=run_training_job, args=(progress_queue,),
+                                            name=f"usvisa-training-{job.job_id}", daemon=True)
+            try:
+                process.start()
+            except Exception as e:
+                with self._lock:
+                    job.status = JOB_STATUS_FAILED
+                    job.error = f"{e}"
+                    job.finished_at = time.time()
+                raise
+            with self._lock:
+                job.status = JOB_STATUS_RUNNING
+                job.started_at = time.time()
+            logging.info(f"Started training job [{job.job_id}] in process [{process.pid}]")
+
+            monitor = threading.Thread(target=self._monitor, args=(job, process, progress_queue),
+                                       name=f"usvisa-training-monitor-{job.job_id}", daemon=True)
+            monitor.start()
+            return job, True
+
+        except Exception as e:
+            raise USvisaException(e, sys) from e
+
+    def _monitor(self, job: TrainingJob, process, progress_queue) -> None:
+        """
+        Drain progress events of the worker process into the job until it finishes
+        """
+        while True:
+            try:
+                kind, stage, event, timestamp = progress_queue.get(timeout=1)
+            except queue.Empty:
+                if process.is_alive():
+                    continue
+                kind, stage, event, timestamp = (JOB_STATUS_FAILED, None,
+                                                 f"Training process exited with code {process.exitcode}", time.time())
+
+            with self._lock:
+                if kind == "stage":
+                    stage_progress = job.stages.setdefault(stage, {"status": None, "started_at": None,
+                                                                   "finished_at": None, "duration_seconds": None})
+                    stage_progress["status"] = event
+                    if event == "started":
+                        stage_progress["started_at"] = timestamp
+                        job.current_stage = stage
+                    else:
+                        stage_progress["finished_at"] = timestamp
+                        if stage_progress["started_at"] is not None:
+                            stage_progress["duration_seconds"] = round(timestamp - stage_progress["started_at"], 3)
+                    continue
+
+                job.finished_at = timestamp
+                job.status = kind
+                if kind == JOB_STATUS_FAILED:
+                    job.error = event
+                    if job.current_stage is not None:
+                        job.stages[job.current_stage]["status"] = JOB_STATUS_FAILED
+                job.current_stage = None
+            logging.info(f"Training job [{job.job_id}] finished with status [{job.status}]")
+            process.join(timeout=5)
+            return
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """
+        Returns: status, per-stage progress and timing of the job, None if the job id is unknown
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return None if job is None else job.to_dict()
@@ -1,4 +1,5 @@
 import sys
+from typing import Callable, Optional
 from US_Visa.exception import USvisaException
 from US_Visa.logger import logging
 
@@ -16,7 +17,12 @@ from US_Visa.entity.artifact_entity import (DataIngestionArtifact, DataValidatio
                                             ModelEvaluationArtifact, ModelPusherArtifact)
 
 class TrainPipeline:
-    def __init__(self):
+    def __init__(self, progress_callback: Optional[Callable[[str, str], None]] = None):
+        """
+        :param progress_callback: Optional callable receiving (stage_name, event) where event is
+                                  "started", "completed" or "skipped" as run_pipeline moves through the stages
+        """
+        self.progress_callback = progress_callback
         self.data_ingestion_config = DataIngestionConfig()
         self.data_validation_config = DataValidationConfig()
         self.data_transformation_config = DataTransformationConfig()
@@ -116,27 +122,47 @@ class TrainPipeline:
             raise USvisaException(e, sys) from e
             
 
+    def report_progress(self, stage: str, event: str) -> None:
+        """
+        This method of TrainPipeline class forwards stage progress to the progress callback, if any
+        """
+        if self.progress_callback is not None:
+            self.progress_callback(stage, event)
+
     def run_pipeline(self) -> None:
         """
         This method of TrainPipeline class is responsible for running complete pipeline
         """
         try:
+            self.report_progress("data_ingestion", "started")
             data_ingestion_artifact = self.start_data_ingestion() 
             logging.info("Completed the data ingestion")
+            self.report_progress("data_ingestion", "completed")
+            self.report_progress("data_validation", "started")
             data_validation_artifact = self.start_data_validation(data_ingestion_artifact=data_ingestion_artifact)
             logging.info("Completed the data validation") 
+            self.report_progress("data_validation", "completed")
+            self.report_progress("data_transformation", "started")
             data_transformation_artifact = self.start_data_transformation(data_ingestion_artifact=data_ingestion_artifact, data_validation_artifact=data_validation_artifact)
             logging.info("Completed the data transformation")
+            self.report_progress("data_transformation", "completed")
+            self.report_progress("model_trainer", "started")
             model_trainer_artifact = self.start_model_trainer(data_transformation_artifact=data_transformation_artifact)
             logging.info("Completed the model training")
+            self.report_progress("model_trainer", "completed")
+            self.report_progress("model_evaluation", "started")
             model_evaluation_artifact = self.start_model_evaluation(data_ingestion_artifact=data_ingestion_artifact,
                                                                     model_trainer_artifact=model_trainer_artifact)
             logging.info("Completed the model evaluation")
+            self.report_progress("model_evaluation", "completed")
             if not model_evaluation_artifact.is_model_accepted:
                 logging.info(f"Model not accepted.")
+                self.report_progress("model_pusher", "skipped")
                 return None
+            self.report_progress("model_pusher", "started")
             model_pusher_artifact = self.start_model_pusher(model_evaluation_artifact=model_evaluation_artifact)
             logging.info("Completed the model pusher")
+            self.report_progress("model_pusher", "completed")
 
 
         except Exception as e:
@@ -1,10 +1,13 @@
 import os 
 import sys
+import time
 
 import numpy as np 
+import pandas as pd
 import dill # Dill is used for serialization (not directly used in these functions)
 import yaml 
 from pandas import DataFrame 
+from pandas.api.types import union_categoricals
 
 from US_Visa.exception import USvisaException
 from US_Visa.logger import logging
@@ -74,6 +77,165 @@ def load_object(file_path: str) -> object:
         raise USvisaException(e, sys) from e
     
     
+def compact_dataframe(dataframe: DataFrame, schema_config: dict) -> DataFrame:
+    """
+    Compact the schema columns present in dataframe, driven by the "columns" and "category_values"
+    sections of the schema:
+    - category columns become Categoricals, with the fixed categories of "category_values" when listed,
+      so the Y/N flags are held as int8 codes; values outside the list are logged and become missing
+    - int columns take the narrowest signed integer holding their range, float32 when they hold missing values
+    - float columns become float32
+
+    Returns:
+    - The compacted DataFrame; its memory before and after is logged.
+    """
+    try:
+        memory_before = dataframe.memory_usage(deep=True).sum()
+        category_values = schema_config.get("category_values", {})
+        columns = {}
+        for column in schema_config["columns"]:
+            for column_name, column_type in column.items():
+                if column_name not in dataframe.columns:
+                    continue
+                values = dataframe[column_name]
+                if column_type == "category" and column_name in category_values:
+                    if isinstance(values.dtype, pd.CategoricalDtype):
+                        # Recode the categories in place of materializing the values as objects
+                        compacted = values.cat.set_categories(category_values[column_name]).array
+                    else:
+                        compacted = pd.Categorical(values.astype(object), categories=category_values[column_name])
+                    unknown = int((compacted.isna() & values.notna().to_numpy()).sum())
+                    if unknown > 0:
+                        logging.warning(f"{unknown} values of [{column_name}] are outside its schema categories")
+                    columns[column_name] = compacted
+                elif column_type == "category":
+                    columns[column_name] = values.astype("category")
+                elif column_type == "int" and not values.isna().any():
+                    columns[column_name] = pd.to_numeric(values, downcast="integer")
+                elif column_type in ("int", "float"):
+                    columns[column_name] = values.astype(np.float32)
+        compacted_dataframe = dataframe.assign(**columns)
+        memory_after = compacted_dataframe.memory_usage(deep=True).sum()
+        logging.info(f"Compacted dataframe of shape {dataframe.shape}: {memory_before / 2 ** 20:.1f} MiB -> "
+                     f"{memory_after / 2 ** 20:.1f} MiB")
+        return compacted_dataframe
+    except Exception as e:
+        raise USvisaException(e, sys) from e
+
+
+def concat_compacted_dataframes(dataframes: list) -> DataFrame:
+    """
+    Concatenate frames compacted by compact_dataframe without going through object columns.
+    Categorical columns whose categories differ between the frames (e.g. case_id) are joined with
+    union_categoricals; the other columns share their dtype or are upcast by pd.concat.
+
+    Returns:
+    - The concatenated DataFrame with a fresh RangeIndex, in the column order of the first frame.
+    """
+    try:
+        dataframes = list(dataframes)
+        if len(dataframes) == 1:
+            return dataframes[0].reset_index(drop=True)
+        unified = {}
+        for column in dataframes[0].columns:
+            dtypes = [dataframe[column].dtype for dataframe in dataframes]
+            if all(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes) \
+                    and any(dtype != dtypes[0] for dtype in dtypes):
+                # Sorted like the categories astype("category") infers on the whole column
+                unified[column] = union_categoricals([dataframe[column] for dataframe in dataframes],
+                                                     sort_categories=True, ignore_order=True)
+        dataframe = pd.concat([dataframe.drop(columns=list(unified)) for dataframe in dataframes], ignore_index=True)
+        return dataframe.assign(**unified)[list(dataframes[0].columns)]
+    except Exception as e:
+        raise USvisaException(e, sys) from e
+
+
+def get_hash_split_mask(keys, test_ratio: float, labels=None, hash_key: str = None,
+                        exact_stratify: bool = False) -> np.ndarray:
+    """
+    Assign every row to the test side of a split by hashing its key, vectorized over the whole column.
+    The key hash is mapped to [0, 1) and rows below test_ratio go to test, so a key always lands on the
+    same side and appended rows never move the existing ones.
+    The rule is the same within every class, so the split is stratified in expectation and stays stable.
+    Only with exact_stratify the threshold is the test_ratio quantile of the hashes within every class,
+    holding the ratio exactly per class; that split is not stable, an append moves the rows between
+    the old and new threshold.
+
+    Parameters:
+    - keys: Series of row keys, e.g. case_id.
+    - test_ratio: float -> Fraction of rows assigned to test.
+    - labels: Series -> Optional; class of every row, only used with exact_stratify.
+    - hash_key: str -> Optional; 16 character key of the hash, the pandas default if None.
+    - exact_stratify: bool -> Hold test_ratio exactly per class of labels, at the cost of stability.
+
+    Returns:
+    - np.ndarray of bool, True for the test rows.
+    """
+    try:
+        hash_kwargs = {} if hash_key is None else {"hash_key": hash_key}
+        hashes = pd.util.hash_pandas_object(pd.Series(keys), index=False, **hash_kwargs).to_numpy()
+        # Top 53 bits of the hash as a float64 fraction in [0, 1)
+        fractions = (hashes >> np.uint64(11)).astype(np.float64) / float(2 ** 53)
+        if labels is None or not exact_stratify:
+            return fractions < test_ratio
+
+        test_mask = np.zeros(len(fractions), dtype=bool)
+        codes, _ = pd.factorize(pd.Series(labels), use_na_sentinel=False)
+        for code in np.unique(codes):
+            class_rows = np.flatnonzero(codes == code)
+            n_test = int(round(test_ratio * len(class_rows)))
+            if n_test == 0:
+                continue
+            threshold = np.partition(fractions[class_rows], n_test - 1)[n_test - 1]
+            test_mask[class_rows] = fractions[class_rows] <= threshold
+        return test_mask
+    except Exception as e:
+        raise USvisaException(e, sys) from e
+
+
+def save_parquet_data(file_path: str, dataframe: DataFrame) -> None:
+    """
+    Parameters:
+    - file_path: str -> The Parquet file the DataFrame is written to.
+    - dataframe: DataFrame -> Data to save, its dtypes (categoricals included) are kept in the file.
+    """
+    try:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        # Write next to the target and rename, so readers never see a partial file
+        staging_file_path = file_path + ".tmp"
+        dataframe.to_parquet(staging_file_path, engine="pyarrow", index=False)
+        os.replace(staging_file_path, file_path)
+    except Exception as e:
+        logging.error("Error saving parquet data", exc_info=True)
+        raise USvisaException(e, sys) from e
+
+
+def load_parquet_data(file_path: str, columns: list = None) -> DataFrame:
+    """
+    Parameters:
+    - file_path: str -> The Parquet file to read.
+    - columns: list -> Optional; only these columns are read from disk, all of them if None.
+
+    Returns:
+    - DataFrame with the dtypes it was saved with.
+    """
+    try:
+        return pd.read_parquet(file_path, engine="pyarrow", columns=columns)
+    except Exception as e:
+        logging.error("Error loading parquet data", exc_info=True)
+        raise USvisaException(e, sys) from e
+
+
+def get_model_input_columns(schema_config: dict) -> list:
+    """
+    Columns the training stages read from the feature store: the schema columns that are not dropped,
+    plus yr_of_estab from which company_age is derived, in schema order.
+    """
+    drop_cols = set(schema_config["drop_columns"]) - {"yr_of_estab"}
+    return [column_name for column in schema_config["columns"] for column_name in column
+            if column_name not in drop_cols]
+
+
 def save_numpy_array_data(file_path: str, array: np.array):
     """
     Parameters:
@@ -162,4 +324,45 @@ def drop_columns(df: DataFrame, cols: list) -> DataFrame:
     except Exception as e:
         # On encountering an error, raise a custom exception with additional debugging information.
         logging.error("Error dropping columns", exc_info=True)
-        raise USvisaException(e, sys) from e
\ No newline at end of file
+        raise USvisaException(e, sys) from e
+
+
+def check_import_budget(started_at: float, budget_seconds: float, forbidden_modules: tuple) -> dict:
+    """
+    Parameters:
+    - started_at (float): time.perf_counter() value taken before the imports being measured.
+    - budget_seconds (float): Maximum import time accepted before a warning is logged.
+    - forbidden_modules (tuple): Top-level packages or module prefixes that must not be loaded yet.
+
+    Returns:
+    - dict: Import time, budget, forbidden modules found in sys.modules and the peak RSS of the process.
+    """
+    elapsed = time.perf_counter() - started_at
+    loaded_forbidden = sorted({
+        name for name in sys.modules
+        for prefix in forbidden_modules
+        if name == prefix or name.startswith(prefix + ".")
+    })
+
+    max_rss_mb = None
+    try:
+        import resource
+        # ru_maxrss is in kilobytes on Linux.
+        max_rss_mb = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    except ImportError:
+        pass
+
+    report = {
+        "import_seconds": round(elapsed, 3),
+        "budget_seconds": budget_seconds,
+        "within_budget": elapsed <= budget_seconds and len(loaded_forbidden) == 0,
+        "forbidden_modules_loaded": loaded_forbidden,
+        "max_rss_mb": max_rss_mb,
+    }
+
+    if elapsed > budget_seconds:
+        logging.warning(f"Import took {elapsed:.3f}s, over the budget of {budget_seconds}s")
+    if len(loaded_forbidden) > 0:
+        logging.warning(f"Training-only modules loaded in the serving process: {loaded_forbidden}")
+    logging.info(f"Import report: {report}")
+    return report
@@ -0,0 +1,94 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+import numpy as np
+
+from US_Visa.constant import METRICS_LATENCY_WINDOW_SIZE, METRICS_LATENCY_QUANTILES
+
+
+class LatencyHistogram:
+    """
+    This class aggregates the latencies of one stage.
+    Count and sum are kept for the lifetime of the process, quantiles are computed
+    over a ring buffer holding the most recent window_size observations.
+    """
+
+    def __init__(self, window_size: int = METRICS_LATENCY_WINDOW_SIZE):
+        """
+        :param window_size: Number of most recent observations the quantiles are computed on
+        """
+        self.count = 0
+        self.sum = 0.0
+        self._window = np.zeros(window_size, dtype=np.float64)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._window[self.count % len(self._window)] = seconds
+            self.count += 1
+            self.sum += seconds
+
+    def snapshot(self, quantiles: tuple = METRICS_LATENCY_QUANTILES) -> dict:
+        """
+        Returns: count, sum and the requested quantiles of the window, quantiles are None before any observation
+        """
+        with self._lock:
+            count, total = self.count, self.sum
+            window = self._window[:min(count, len(self._window))].copy()
+        values = np.quantile(window, quantiles) if len(window) > 0 else [None] * len(quantiles)
+        return {"count": count, "sum": total,
+                "quantiles": {quantile: (None if value is None else float(value))
+                              for quantile, value in zip(quantiles, values)}}
+
+
+class LatencyMetrics:
+    """
+    This class is the process-wide registry of per-stage LatencyHistograms of the prediction path.
+    """
+
+    def __init__(self, window_size: int = METRICS_LATENCY_WINDOW_SIZE):
+        self.window_size = window_size
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float) -> None:
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(stage, LatencyHistogram(window_size=self.window_size))
+        histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, stage: str):
+        """
+        Time the enclosed block on the monotonic clock and record it under stage, also when it raises
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {stage: histogram.snapshot() for stage, histogram in sorted(histograms.items())}
+
+    def to_prometheus(self, metric_name: str = "usvisa_stage_latency_seconds") -> str:
+        """
+        Render every stage as a Prometheus summary in the text exposition format
+        """
+        lines = [f"# HELP {metric_name} Latency of the prediction path stages in seconds.",
+                 f"# TYPE {metric_name} summary"]
+        for stage, snapshot in self.snapshot().items():
+            for quantile, value in snapshot["quantiles"].items():
+                value = "NaN" if value is None else repr(value)
+                lines.append(f'{metric_name}{{stage="{stage}",quantile="{quantile}"}} {value}')
+            lines.append(f'{metric_name}_sum{{stage="{stage}"}} {snapshot["sum"]!r}')
+            lines.append(f'{metric_name}_count{{stage="{stage}"}} {snapshot["count"]}')
+        return "\n".join(lines) + "\n"
+
+
+latency_metrics = LatencyMetrics()
@@ -1,6 +1,12 @@
-from fastapi import FastAPI, Request
+import time
+app_import_started_at = time.perf_counter()
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import FastAPI, File, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import Response, JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from starlette.responses import HTMLResponse, RedirectResponse
@@ -8,10 +14,22 @@ from uvicorn import run as app_run
 
 from typing import Optional
 
-from US_Visa.constant import APP_HOST, APP_PORT
+from US_Visa.constant import APP_HOST, APP_PORT, PREDICTION_EXECUTOR_MAX_WORKERS, PREDICTION_WARMUP_RETRY_SECONDS, \
+    APP_IMPORT_TIME_BUDGET_SECONDS, APP_TRAINING_ONLY_MODULES
+from US_Visa.logger import logging
+from US_Visa.utils.main_utils import check_import_budget
+from US_Visa.utils.metrics import latency_metrics
 
-from US_Visa.pipeline.prediction_pipeline import USvisaData, USvisaClassifier
-from US_Visa.pipeline.training_pipeline import TrainPipeline
+from US_Visa.pipeline.prediction_pipeline import USvisaData, USvisaBatchData, USvisaClassifier
+from US_Visa.pipeline.prediction_batcher import PredictionBatcher
+from US_Visa.pipeline.shadow_scorer import ShadowScorer
+from US_Visa.entity.estimator import TargetValueMapping
+# Only the job manager is imported here, TrainPipeline is imported inside the training worker process.
+from US_Visa.pipeline.training_jobs import TrainingJobManager
+
+app_import_report = check_import_budget(started_at=app_import_started_at,
+                                        budget_seconds=APP_IMPORT_TIME_BUDGET_SECONDS,
+                                        forbidden_modules=APP_TRAINING_ONLY_MODULES)
 
 app = FastAPI()
 
@@ -19,6 +37,20 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 
 templates = Jinja2Templates(directory='templates')
 
+# Bounded pool for CPU-bound inference and model loading, keeps the event loop free for I/O.
+inference_executor = ThreadPoolExecutor(max_workers=PREDICTION_EXECUTOR_MAX_WORKERS,
+                                        thread_name_prefix="usvisa-inference")
+
+# Candidate model scoring the answered batches on its own threads, see SHADOW_MODEL_VERSION.
+shadow_scorer = ShadowScorer(model_registry=USvisaClassifier.get_model_registry())
+
+prediction_batcher = PredictionBatcher(executor=inference_executor, shadow_scorer=shadow_scorer)
+
+training_job_manager = TrainingJobManager()
+
+# Readiness of this replica, flipped by the startup warm-up once the model has served a prediction.
+model_warmup = {"ready": False, "attempts": 0, "seconds": None, "error": None}
+
 origins = ["*"]
 
 app.add_middleware(
@@ -57,6 +89,45 @@ class DataForm:
         self.unit_of_wage = form.get("unit_of_wage")
         self.full_time_position = form.get("full_time_position")
 
+async def warm_up_model():
+    loop = asyncio.get_running_loop()
+    while not model_warmup["ready"]:
+        model_warmup["attempts"] += 1
+        try:
+            model_warmup["seconds"] = round(
+                await loop.run_in_executor(inference_executor, USvisaClassifier().warm_up), 3)
+            model_warmup["error"] = None
+            model_warmup["ready"] = True
+        except Exception as e:
+            model_warmup["error"] = f"{e}"
+            logging.info(f"Model warm-up attempt {model_warmup['attempts']} failed, "
+                         f"retrying in {PREDICTION_WARMUP_RETRY_SECONDS}s: {e}")
+            await asyncio.sleep(PREDICTION_WARMUP_RETRY_SECONDS)
+
+
+@app.on_event("startup")
+async def startup():
+    # Warm up in the background so /healthz answers while the model is still downloading.
+    app.state.warmup_task = asyncio.create_task(warm_up_model())
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    shadow_scorer.shutdown()
+
+
+@app.get("/healthz")
+async def healthzRouteClient():
+    return {"status": "alive"}
+
+
+@app.get("/readyz")
+async def readyzRouteClient():
+    if not model_warmup["ready"]:
+        return JSONResponse(status_code=503, content={"status": "warming_up", **model_warmup})
+    return {"status": "ready", **model_warmup, "imports": app_import_report}
+
+
 @app.get("/", tags=["authentication"])
 async def index(request: Request):
 
@@ -67,21 +138,28 @@ async def index(request: Request):
 @app.get("/train")
 async def trainRouteClient():
     try:
-        train_pipeline = TrainPipeline()
+        job, created = training_job_manager.submit()
 
-        train_pipeline.run_pipeline()
-
-        return Response("Training successful !!")
+        return {"job_id": job.job_id, "status": job.status, "deduplicated": not created}
 
     except Exception as e:
         return Response(f"Error Occurred! {e}")
 
 
+@app.get("/train/{job_id}")
+async def trainStatusRouteClient(job_id: str):
+    job = training_job_manager.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"status": False, "error": f"Unknown training job {job_id}"})
+    return job
+
+
 @app.post("/")
 async def predictRouteClient(request: Request):
     try:
         form = DataForm(request)
-        await form.get_usvisa_data()
+        with latency_metrics.timer("form_parse"):
+            await form.get_usvisa_data()
         
         usvisa_data = USvisaData(
                                 continent= form.continent,
@@ -96,11 +174,10 @@ async def predictRouteClient(request: Request):
                                 full_time_position= form.full_time_position,
                                 )
         
-        usvisa_df = usvisa_data.get_usvisa_input_data_frame()
-
-        model_predictor = USvisaClassifier()
+        with latency_metrics.timer("input_dataframe"):
+            usvisa_df = usvisa_data.get_usvisa_input_data_frame()
 
-        value = model_predictor.predict(dataframe=usvisa_df)[0]
+        value = (await prediction_batcher.predict(dataframe=usvisa_df))[0]
 
         status = None
         if value == 1:
@@ -108,14 +185,112 @@ async def predictRouteClient(request: Request):
         else:
             status = "Visa Not-Approved"
 
-        return templates.TemplateResponse(
-            "usvisa.html",
-            {"request": request, "context": status},
-        )
+        with latency_metrics.timer("template_render"):
+            return templates.TemplateResponse(
+                "usvisa.html",
+                {"request": request, "context": status},
+            )
         
     except Exception as e:
         return {"status": False, "error": f"{e}"}
 
+
+@app.post("/predict/batch")
+async def predictBatchRouteClient(request: Request, model_version: Optional[str] = None):
+    try:
+        payload = await request.json()
+        records = payload.get("records") if isinstance(payload, dict) else payload
+        if isinstance(payload, dict) and payload.get("model_version") is not None:
+            model_version = payload["model_version"]
+
+        usvisa_batch_data = USvisaBatchData(records=records)
+
+        usvisa_df = usvisa_batch_data.get_usvisa_input_data_frame()
+
+        model_predictor = USvisaClassifier()
+
+        predictions, scores = await asyncio.get_running_loop().run_in_executor(
+            inference_executor, model_predictor.predict_status_with_scores, usvisa_df, model_version)
+
+        if model_version is None:
+            target_value_mapping = TargetValueMapping()._asdict()
+            shadow_scorer.submit(usvisa_df, [target_value_mapping[prediction] for prediction in predictions], scores)
+
+        return {"status": True, "count": len(predictions), "model_version": model_predictor.model_version,
+                "predictions": predictions, "scores": scores}
+
+    except Exception as e:
+        return {"status": False, "error": f"{e}"}
+
+@app.post("/predict/csv")
+async def predictCsvRouteClient(file: UploadFile = File(...), model_version: Optional[str] = None):
+    try:
+        loop = asyncio.get_running_loop()
+        model_predictor = USvisaClassifier()
+        csv_chunks = model_predictor.predict_csv(file.file, model_version=model_version)
+
+        # Score the first chunk before answering so a malformed upload still gets an error response.
+        first_chunk = await loop.run_in_executor(inference_executor, next, csv_chunks, None)
+
+        async def stream_predictions():
+            chunk = first_chunk
+            while chunk is not None:
+                yield chunk
+                chunk = await loop.run_in_executor(inference_executor, next, csv_chunks, None)
+
+        return StreamingResponse(stream_predictions(), media_type="text/csv",
+                                 headers={"Content-Disposition": "attachment; filename=predictions.csv"})
+
+    except Exception as e:
+        return {"status": False, "error": f"{e}"}
+
+
+@app.get("/predict/cache")
+async def predictionCacheRouteClient():
+    prediction_cache = USvisaClassifier.get_prediction_cache()
+    if prediction_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **prediction_cache.stats()}
+
+@app.get("/models")
+async def modelsRouteClient():
+    return USvisaClassifier.get_model_registry().stats()
+
+
+@app.post("/models/{model_version}/activate")
+async def activateModelRouteClient(model_version: str):
+    try:
+        # The version is loaded on the executor if needed, the switch itself is a pointer swap.
+        await asyncio.get_running_loop().run_in_executor(
+            inference_executor, USvisaClassifier.get_model_registry().activate, model_version)
+        return {"status": True, **USvisaClassifier.get_model_registry().stats()}
+
+    except Exception as e:
+        return JSONResponse(status_code=400, content={"status": False, "error": f"{e}"})
+
+
+@app.get("/shadow")
+async def shadowRouteClient():
+    return shadow_scorer.stats()
+
+
+@app.post("/shadow/{model_version}")
+async def shadowCandidateRouteClient(model_version: str):
+    shadow_scorer.set_candidate(model_version)
+    return shadow_scorer.stats()
+
+
+@app.delete("/shadow")
+async def shadowDisableRouteClient():
+    shadow_scorer.flush()
+    shadow_scorer.set_candidate(None)
+    return shadow_scorer.stats()
+
+
+@app.get("/metrics")
+async def metricsRouteClient():
+    return PlainTextResponse(latency_metrics.to_prometheus(), media_type="text/plain; version=0.0.4")
+
 # Runn app.py locally
 
 if __name__ == "__main__":
@@ -0,0 +1,43 @@
+import argparse
+
+from US_Visa.entity.config_entity import BatchPredictionConfig
+from US_Visa.pipeline.batch_prediction import BatchPrediction
+
+
+def main():
+    default_config = BatchPredictionConfig()
+    parser = argparse.ArgumentParser(description="Rescore a MongoDB collection of visa cases offline.")
+    parser.add_argument("--input-collection", default=default_config.input_collection_name)
+    parser.add_argument("--output-collection", default=default_config.output_collection_name)
+    parser.add_argument("--batch-size", type=int, default=default_config.batch_size)
+    parser.add_argument("--workers", type=int, default=default_config.max_workers)
+    parser.add_argument("--model-file", default=None,
+                        help="Local model.pkl or NumPy model directory to score with instead of the production model in S3")
+    parser.add_argument("--mongomock", action="store_true",
+                        help="Use an in-memory mongomock client instead of MONGODB_URL_KEY (requires mongomock)")
+    parser.add_argument("--seed-csv", default=None,
+                        help="CSV of raw visa cases inserted into the input collection before scoring, e.g. notebook/Visadataset.csv")
+    args = parser.parse_args()
+
+    if args.mongomock:
+        import mongomock
+        from US_Visa.configuration.mongo_db_connection import MongoDBClient
+        MongoDBClient.client = mongomock.MongoClient()
+
+    if args.seed_csv is not None:
+        import pandas as pd
+        from US_Visa.data_access.usvisa_data import USvisaData
+        seed_df = pd.read_csv(args.seed_csv)
+        USvisaData().mongo_client.database[args.input_collection].insert_many(seed_df.to_dict(orient="records"))
+
+    batch_prediction_config = BatchPredictionConfig(input_collection_name=args.input_collection,
+                                                    output_collection_name=args.output_collection,
+                                                    batch_size=args.batch_size,
+                                                    max_workers=args.workers,
+                                                    model_file_path=args.model_file)
+    summary = BatchPrediction(batch_prediction_config=batch_prediction_config).run()
+    print(f"Scored {summary['rows']} rows in {summary['elapsed_seconds']}s ({summary['rows_per_second']} rows/sec)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from US_Visa.components.data_transformation import DataTransformation
+from US_Visa.constant import SCHEMA_FILE_PATH
+from US_Visa.entity.compiled_preprocessor import CompiledPreprocessor
+from US_Visa.entity.config_entity import DataTransformationConfig
+from US_Visa.entity.estimator import USvisaModel
+from US_Visa.utils.main_utils import read_yaml_file
+
+
+@pytest.fixture(scope="module")
+def input_feature_df() -> pd.DataFrame:
+    """
+    Small raw feature frame holding every schema category of the encoded columns
+    """
+    schema_config = read_yaml_file(file_path=SCHEMA_FILE_PATH)
+    rng = np.random.default_rng(0)
+    n_rows = 40
+    dataframe = pd.DataFrame({
+        column: np.resize(schema_config["category_values"][column], n_rows)
+        for column in schema_config["oh_columns"] + schema_config["or_columns"]
+    })
+    # Negative employee counts and company ages also exercise the negative Yeo-Johnson branch.
+    dataframe["no_of_employees"] = rng.integers(-20, 50000, n_rows)
+    dataframe["prevailing_wage"] = rng.uniform(2.0, 300000.0, n_rows)
+    dataframe["company_age"] = rng.integers(-5, 200, n_rows)
+    return dataframe
+
+
+@pytest.fixture(scope="module")
+def preprocessor(input_feature_df):
+    data_transformation = DataTransformation(data_ingestion_artifact=None,
+                                             data_transformation_config=DataTransformationConfig(),
+                                             data_validation_artifact=None)
+    return data_transformation.get_data_transformer_object().fit(input_feature_df)
+
+
+@pytest.fixture(scope="module")
+def compiled_preprocessor(preprocessor):
+    return CompiledPreprocessor.from_column_transformer(preprocessor)
+
+
+def test_transform_matches_sklearn(preprocessor, compiled_preprocessor, input_feature_df):
+    expected = preprocessor.transform(input_feature_df)
+    np.testing.assert_allclose(compiled_preprocessor.transform(input_feature_df), expected, rtol=1e-10, atol=1e-10)
+
+
+def test_transform_record_matches_sklearn(preprocessor, compiled_preprocessor, input_feature_df):
+    expected = preprocessor.transform(input_feature_df)
+    for position, record in enumerate(input_feature_df.to_dict(orient="records")):
+        np.testing.assert_allclose(compiled_preprocessor.transform_record(record), expected[position],
+                                   rtol=1e-10, atol=1e-10)
+
+
+def test_single_row_model_transform_matches_sklearn(preprocessor, compiled_preprocessor, input_feature_df):
+    usvisa_model = USvisaModel(preprocessing_object=preprocessor, trained_model_object=None,
+                               compiled_preprocessing_object=compiled_preprocessor)
+    expected = preprocessor.transform(input_feature_df)
+    for position in range(3):
+        np.testing.assert_allclose(usvisa_model.transform(input_feature_df.iloc[[position]]), expected[[position]],
+                                   rtol=1e-10, atol=1e-10)
+
+
+def test_unknown_category_raises(compiled_preprocessor, input_feature_df):
+    record = input_feature_df.to_dict(orient="records")[0]
+    record["continent"] = "Antarctica"
+    with pytest.raises(ValueError):
+        compiled_preprocessor.transform_record(record)
+    with pytest.raises(Exception, match="Antarctica"):
+        compiled_preprocessor.transform(pd.DataFrame([record]))
+
+
+def test_record_from_frame_matches_first_row(input_feature_df):
+    expected = input_feature_df.iloc[[3]].to_dict(orient="records")[0]
+    categorical_df = input_feature_df.astype({column: "category" for column in input_feature_df.columns[:3]})
+    frames = [input_feature_df.iloc[[3]],
+              pd.concat([input_feature_df.iloc[[position]] for position in range(5)], ignore_index=True).iloc[[3]],
+              categorical_df.iloc[[3]]]
+    for frame in frames:
+        assert CompiledPreprocessor.record_from_frame(frame) == expected
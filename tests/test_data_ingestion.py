@@ -0,0 +1,88 @@
+import os
+
+import pandas as pd
+import pytest
+
+from US_Visa.components.data_ingestion import DataIngestion
+from US_Visa.configuration.mongo_db_connection import MongoDBClient
+from US_Visa.constant import DATABASE_NAME
+from US_Visa.entity.config_entity import DataIngestionConfig
+from US_Visa.utils.main_utils import load_parquet_data
+
+mongomock = pytest.importorskip("mongomock")
+
+DATASET_FILE_PATH = os.path.join("notebook", "Visadataset.csv")
+
+
+@pytest.fixture
+def visa_collection(monkeypatch):
+    """
+    In-memory collection holding the first 2000 visa cases, served through the shared MongoDBClient
+    """
+    client = mongomock.MongoClient()
+    monkeypatch.setattr(MongoDBClient, "client", client)
+    collection = client[DATABASE_NAME]["visa_data"]
+    collection.insert_many(pd.read_csv(DATASET_FILE_PATH, nrows=2000).to_dict(orient="records"))
+    return collection
+
+
+def make_config(tmp_path, **overrides) -> DataIngestionConfig:
+    """
+    Ingestion configuration with every artifact and state file under tmp_path
+    """
+    state_dir = tmp_path / "state"
+    ingestion_dir = tmp_path / "data_ingestion"
+    settings = dict(
+        feature_store_file_path=str(ingestion_dir / "feature_store" / "usvisa.parquet"),
+        training_file_path=str(ingestion_dir / "ingested" / "train.parquet"),
+        testing_file_path=str(ingestion_dir / "ingested" / "test.parquet"),
+        collection_name="visa_data",
+        export_batch_size=256,
+        incremental=False,
+        reuse_unchanged=False,
+        persistent_feature_store_file_path=str(state_dir / "usvisa.parquet"),
+        watermark_file_path=str(state_dir / "watermark.json"),
+        fingerprint_file_path=str(state_dir / "fingerprint.json"),
+        export_partitions=1,
+        export_max_workers=2,
+        export_executor="thread",
+        feature_store_parts_dir=str(ingestion_dir / "feature_store" / "parts"),
+    )
+    settings.update(overrides)
+    return DataIngestionConfig(**settings)
+
+
+def test_partitioned_export_matches_single_cursor(visa_collection, tmp_path):
+    single = DataIngestion(make_config(tmp_path / "single")).export_data_into_feature_store()
+    partitioned = DataIngestion(make_config(tmp_path / "partitioned", export_partitions=4)) \
+        .export_data_into_feature_store()
+
+    assert len(os.listdir(tmp_path / "partitioned" / "data_ingestion" / "feature_store" / "parts")) > 1
+    pd.testing.assert_frame_equal(partitioned, single)
+
+
+def test_incremental_ingestion_merges_appended_documents(visa_collection, tmp_path, monkeypatch):
+    config = make_config(tmp_path, incremental=True, reuse_unchanged=True)
+    first_artifact = DataIngestion(config).initiate_data_ingestion()
+
+    # Unchanged collection: the last artifact is reused without exporting
+    with monkeypatch.context() as patch:
+        patch.setattr(DataIngestion, "export_data_into_feature_store",
+                      lambda self: pytest.fail("unchanged collection was exported again"))
+        assert DataIngestion(config).initiate_data_ingestion() == first_artifact
+
+    appended = pd.read_csv(DATASET_FILE_PATH, skiprows=range(1, 2001), nrows=300)
+    changed_case = visa_collection.find_one({"case_id": "EZYV01"}, {"_id": 0})
+    changed_case["prevailing_wage"] = 123456.5
+    visa_collection.insert_many(appended.to_dict(orient="records") + [changed_case])
+    DataIngestion(config).initiate_data_ingestion()
+
+    merged = load_parquet_data(config.persistent_feature_store_file_path)
+    expected = DataIngestion(make_config(tmp_path / "full")).export_data_into_feature_store() \
+        .drop_duplicates(subset=["case_id"], keep="last", ignore_index=True)
+    pd.testing.assert_frame_equal(merged, expected)
+    assert merged.loc[merged["case_id"] == "EZYV01", "prevailing_wage"].tolist() == [123456.5]
+
+    assert DataIngestion(config).read_watermark() == max(visa_collection.distinct("_id"))
+    split_rows = len(load_parquet_data(config.training_file_path)) + len(load_parquet_data(config.testing_file_path))
+    assert split_rows == len(merged) == 2300
@@ -0,0 +1,114 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.neighbors import KNeighborsClassifier
+
+from US_Visa.components.data_transformation import DataTransformation
+from US_Visa.constant import NUMPY_MODEL_FORMAT_VERSION, NUMPY_MODEL_MANIFEST_FILE_NAME, SCHEMA_FILE_PATH
+from US_Visa.entity.compiled_preprocessor import CompiledPreprocessor
+from US_Visa.entity.config_entity import DataTransformationConfig
+from US_Visa.entity.estimator import USvisaModel
+from US_Visa.entity.numpy_model import NumpyKNeighborsClassifier, NumpyRandomForestClassifier, load_numpy_model, \
+    save_numpy_model
+from US_Visa.exception import USvisaException
+from US_Visa.utils.main_utils import read_yaml_file
+
+
+@pytest.fixture(scope="module")
+def training_data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 6))
+    y = (X[:, 0] + 0.5 * rng.normal(size=600) > 0).astype(int)
+    return X, y
+
+
+@pytest.fixture(scope="module")
+def queries(training_data):
+    X, _ = training_data
+    rng = np.random.default_rng(1)
+    # New points and training rows, whose nearest neighbour is an exact match
+    return np.vstack([rng.normal(size=(150, 6)), X[:50]])
+
+
+@pytest.mark.parametrize("algorithm", ["kd_tree", "ball_tree", "brute"])
+@pytest.mark.parametrize("weights", ["uniform", "distance"])
+@pytest.mark.parametrize("p", [1, 2])
+def test_kneighbors_matches_sklearn(training_data, queries, algorithm, weights, p):
+    X, y = training_data
+    # A small leaf size gives a tree deep enough to exercise the pruning and the leaf rounds
+    model = KNeighborsClassifier(n_neighbors=7, weights=weights, p=p, algorithm=algorithm, leaf_size=4).fit(X, y)
+    numpy_model = NumpyKNeighborsClassifier.from_sklearn(model)
+    assert numpy_model.node_start is not None
+
+    for batch in [queries, *(queries[[position]] for position in (0, 75, 160))]:
+        expected_distances, _ = model.kneighbors(batch)
+        distances, _ = numpy_model.kneighbors(batch)
+        np.testing.assert_allclose(distances, expected_distances, rtol=1e-12, atol=1e-12)
+        np.testing.assert_allclose(numpy_model.predict_proba(batch), model.predict_proba(batch), rtol=1e-12, atol=1e-12)
+        np.testing.assert_array_equal(numpy_model.predict(batch), model.predict(batch))
+
+
+@pytest.fixture(scope="module")
+def visa_model():
+    """
+    Random forest USvisaModel with a compiled preprocessor, fitted on a raw frame holding every schema category
+    """
+    schema_config = read_yaml_file(file_path=SCHEMA_FILE_PATH)
+    rng = np.random.default_rng(0)
+    n_rows = 300
+    dataframe = pd.DataFrame({
+        column: rng.choice(schema_config["category_values"][column], n_rows)
+        for column in schema_config["oh_columns"] + schema_config["or_columns"]
+    })
+    dataframe["no_of_employees"] = rng.integers(1, 50000, n_rows)
+    dataframe["prevailing_wage"] = rng.uniform(2.0, 300000.0, n_rows)
+    dataframe["company_age"] = rng.integers(1, 200, n_rows)
+    target = (np.log(dataframe["prevailing_wage"]) + rng.normal(size=n_rows) > 10.5).astype(int)
+
+    data_transformation = DataTransformation(data_ingestion_artifact=None,
+                                             data_transformation_config=DataTransformationConfig(),
+                                             data_validation_artifact=None)
+    preprocessor = data_transformation.get_data_transformer_object().fit(dataframe)
+    model = RandomForestClassifier(n_estimators=15, random_state=0).fit(preprocessor.transform(dataframe), target)
+    usvisa_model = USvisaModel(preprocessing_object=preprocessor, trained_model_object=model,
+                               compiled_preprocessing_object=CompiledPreprocessor.from_column_transformer(preprocessor))
+    return usvisa_model, dataframe
+
+
+def test_random_forest_round_trip_matches_sklearn(visa_model, tmp_path):
+    usvisa_model, dataframe = visa_model
+    features = usvisa_model.preprocessing_object.transform(dataframe)
+    version_dir = save_numpy_model(usvisa_model, str(tmp_path), verification_array=features)
+    assert os.path.basename(version_dir) == f"v{NUMPY_MODEL_FORMAT_VERSION}"
+
+    loaded_model = load_numpy_model(str(tmp_path), mmap_mode="r")
+    numpy_model = loaded_model.trained_model_object
+    assert isinstance(numpy_model, NumpyRandomForestClassifier)
+    assert isinstance(numpy_model.value, np.memmap)
+
+    sklearn_model = usvisa_model.trained_model_object
+    np.testing.assert_allclose(loaded_model.predict_proba(dataframe), sklearn_model.predict_proba(features),
+                               rtol=1e-6, atol=1e-6)
+    np.testing.assert_array_equal(loaded_model.predict(dataframe), sklearn_model.predict(features))
+    # Single rows go through the record path of the compiled preprocessor
+    for position in (0, 150):
+        np.testing.assert_array_equal(loaded_model.predict(dataframe.iloc[[position]]),
+                                      sklearn_model.predict(features[[position]]))
+
+
+def test_load_rejects_other_format_version(visa_model, tmp_path):
+    usvisa_model, _ = visa_model
+    version_dir = save_numpy_model(usvisa_model, str(tmp_path))
+    manifest_file_path = os.path.join(version_dir, NUMPY_MODEL_MANIFEST_FILE_NAME)
+    with open(manifest_file_path) as manifest_file:
+        manifest = json.load(manifest_file)
+    manifest["format_version"] = NUMPY_MODEL_FORMAT_VERSION + 1
+    with open(manifest_file_path, "w") as manifest_file:
+        json.dump(manifest, manifest_file)
+
+    with pytest.raises(USvisaException, match="Unsupported NumPy model format version"):
+        load_numpy_model(str(tmp_path))
@@ -0,0 +1,53 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from US_Visa.entity.config_entity import PredictionBatcherConfig
+from US_Visa.exception import USvisaException
+from US_Visa.pipeline.prediction_batcher import PredictionBatcher
+
+
+class ContinentPredictor:
+    """
+    Echoes no_of_employees as the prediction of every row, rejects continents it was not fitted on
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, dataframe: pd.DataFrame) -> np.ndarray:
+        self.calls += 1
+        if (dataframe["continent"] == "Antarctica").any():
+            raise ValueError("Found unknown category 'Antarctica' during transform")
+        return dataframe["no_of_employees"].to_numpy()
+
+
+async def predict_concurrently(batcher: PredictionBatcher, frames: list) -> list:
+    return await asyncio.gather(*(batcher.predict(frame) for frame in frames), return_exceptions=True)
+
+
+def test_unscorable_request_fails_alone():
+    predictor = ContinentPredictor()
+    batcher = PredictionBatcher(model_predictor=predictor,
+                                batcher_config=PredictionBatcherConfig(max_batch_size=64, max_wait_ms=50))
+    continents = ["Asia", "Europe", "Antarctica", "Africa", "Asia", "Oceania"]
+    frames = [pd.DataFrame({"continent": [continent], "no_of_employees": [position]})
+              for position, continent in enumerate(continents)]
+
+    results = asyncio.run(predict_concurrently(batcher, frames))
+
+    assert isinstance(results[2], USvisaException)
+    for position, result in enumerate(results):
+        if position != 2:
+            assert result.tolist() == [position]
+    # One failed batched call, then one call per request
+    assert predictor.calls == 1 + len(frames)
+
+
+def test_single_request_error_is_raised():
+    batcher = PredictionBatcher(model_predictor=ContinentPredictor())
+    frame = pd.DataFrame({"continent": ["Antarctica"], "no_of_employees": [1]})
+    with pytest.raises(USvisaException):
+        asyncio.run(batcher.predict(frame))